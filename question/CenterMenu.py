@@ -1,16 +1,11 @@
 import sys, os
+import multiprocessing
 import json, logging
 from PyQt6.QtCore import Qt, QObject, pyqtSlot, pyqtSignal, QTimer
 from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QTabWidget, QSizePolicy
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebChannel import QWebChannel
-from question.base import Questions, question_show
-
-try:
-    d3_js = open("question/base/d3.v7.min.js", "r", encoding="utf-8").read()
-except FileNotFoundError as e:
-    print(f"file not found cwd:{os.getcwd()}")
-    raise e
+from question.base import AppScheme, GraphLayout, Questions, TagTree, question_show
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format='%(levelname)s:%(message)s')
@@ -18,8 +13,13 @@ logger.setLevel(logging.DEBUG)
 
 
 class NodeData(QObject):
+    """
+    图的数据, 与前端通过版本号同步
+    updateGraph 发送完整的图, 只在页面加载或前端版本对不上时使用
+    graphPatch 发送自上次以来的增量: 删除节点/连线, 新增节点/连线, 修改节点属性
+    """
     updateGraph = pyqtSignal(str)
-    positionChanged = pyqtSignal(str)
+    graphPatch = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
@@ -29,68 +29,182 @@ class NodeData(QObject):
             {"id": "C", "tag": "info_C", "x": 0, "y": 0}
         ]
         self.links = [
-            {"source": "A", "target": "B"},
-            {"source": "B", "target": "C"}
+            {"id": "A->B", "source": "A", "target": "B"},
+            {"id": "B->C", "source": "B", "target": "C"}
         ]
-        self.node_names = ["A", "B", "C"]
+        self.node_index : dict[str, dict] = {node["id"]: node for node in self.nodes}
+#                              id : 节点
         self.added_tag = []
         self.upper : GraphWindow | None = None
         self._alive = True  # 新增存活标记
 
+        self.version = 0
+        # 尚未发送的增量
+        self.removed_nodes : list[str] = []
+        self.removed_links : list[str] = []
+        self.added_nodes : dict[str, dict] = {}
+        self.added_links : dict[str, dict] = {}
+        self.patched_nodes : dict[str, dict] = {}
+
+        # 预先计算的布局, 拖动后的位置延迟写回缓存
+        self.layout_cache = GraphLayout.LayoutCache()
+        self.layout_key : str | None = None
+        self.layout_save_timer = QTimer(self)
+        self.layout_save_timer.setSingleShot(True)
+        self.layout_save_timer.setInterval(1000)
+        self.layout_save_timer.timeout.connect(self.layout_cache.save)
+
     @pyqtSlot(str)
     def handleNodeClick(self, tag : str):
         logger.debug(f"Node clicked! Tag: {tag}")
-        opt = tag.split("::")
-        if opt[0] == 'menu':
-            self.clear()
-            self.upper.add_one_tag(opt[1])
-        elif opt[0] == "exit":
-            self.clear()
-            self.upper.send_initial_data()
-        else:
-            new_window = question_show.HomeWindow(self.upper, tag)
+        question_id = self.upper.tag_tree.click(tag)
+        if question_id is not None:
+            new_window = question_show.HomeWindow(self.upper, str(question_id))
             new_window.show()
-
-        self.refresh_graph()
+        else:
+            self.upper.send_initial_data()
 
     @pyqtSlot(str, float, float)  # 新增位置处理槽
     def handlePositionChange(self, node_id, x, y):
-        for node in self.nodes:
-            if node["id"] == node_id:
-                node["x"] = x
-                node["y"] = y
-        self.positionChanged.emit(json.dumps(self.nodes))
+        node = self.node_index.get(node_id)
+        if node is not None:
+            node["x"] = x
+            node["y"] = y
+            if self.layout_key is not None:
+                self.layout_cache.update(self.layout_key, node_id, x, y)
+                self.layout_save_timer.start()
+
+    @pyqtSlot(str)
+    def handlePositionsChanged(self, data : str):
+        """
+        前端每一帧合并发送一次拖动中的位置 [[id, x, y], ...]
+        位置由前端维护, 这里只记录下来, 不再回传
+        """
+        for node_id, x, y in json.loads(data):
+            self.handlePositionChange(node_id, x, y)
+
+    @pyqtSlot(int)
+    def requestFullGraph(self, version : int):
+        """前端的版本与增量对不上时请求完整的图"""
+        logger.debug(f"前端版本{version}, 当前版本{self.version}, 重新发送完整的图")
+        self.refresh_graph()
 
     def updateNodeTag(self, node_id, new_tag):
         print("Python端updateNodeTag被调用")
-        for node in self.nodes:
-            if node["id"] == node_id:
-                node["tag"] = new_tag
-        self.updateGraph.emit(json.dumps({
-            "nodes": self.nodes,
-            "links": self.links
-        }))
+        node = self.node_index.get(node_id)
+        if node is not None:
+            node["tag"] = new_tag
+            self.patch_node(node_id, tag=new_tag)
+        self.flush()
+
+    def has_pending(self) -> bool:
+        return bool(self.removed_nodes or self.removed_links or self.added_nodes or self.added_links
+                    or self.patched_nodes)
+
+    def clear_pending(self):
+        self.removed_nodes, self.removed_links = [], []
+        self.added_nodes, self.added_links, self.patched_nodes = {}, {}, {}
+
+    def apply_layout(self):
+        """
+        给新加入的节点填上预先计算(或缓存)的位置
+        已经发送过的节点位置由前端维护, 布局时保持不动
+        """
+        fixed = {node_id: (node["x"], node["y"]) for node_id, node in self.node_index.items()
+                 if node_id not in self.added_nodes}
+        links = [(link["source"], link["target"]) for link in self.links]
+        self.layout_key, positions = GraphLayout.get_layout(list(self.node_index), links, self.layout_cache, fixed)
+        if self.layout_cache.dirty:
+            self.layout_save_timer.start()  # 新算出的布局稍后写入, 不阻塞发送
+        for node_id, node in self.added_nodes.items():
+            node["x"], node["y"] = positions[node_id]
 
     def refresh_graph(self):
+        """发送完整的图, 未发送的增量已经包含在内, 直接作为新版本"""
+        if self.added_nodes:
+            self.apply_layout()
+        if self.has_pending():
+            self.version += 1
+            self.clear_pending()
         self.updateGraph.emit(json.dumps({
+            "version": self.version,
+            "layout": self.layout_key is not None,
             "nodes": self.nodes,
             "links": self.links
         }))
 
+    def flush(self):
+        """把积累的增量作为一个新版本发送给前端"""
+        if not self.has_pending():
+            return
+        if self.added_nodes:
+            self.apply_layout()
+        self.version += 1
+        self.graphPatch.emit(json.dumps({
+            "base": self.version - 1,
+            "version": self.version,
+            "layout": self.layout_key is not None,
+            "remove": {"nodes": self.removed_nodes, "links": self.removed_links},
+            "add": {"nodes": list(self.added_nodes.values()), "links": list(self.added_links.values())},
+            "patch": list(self.patched_nodes.values())
+        }))
+        self.clear_pending()
+
+    def patch_node(self, node_id : str, **attrs):
+        if node_id in self.added_nodes:
+            return  # 新增的节点还没发送, 发送时已经是新属性
+        self.patched_nodes.setdefault(node_id, {"id": node_id}).update(attrs)
+
     def clear(self):
+        for node in self.nodes:
+            if self.added_nodes.pop(node["id"], None) is None:
+                self.removed_nodes.append(node["id"])
+        for link in self.links:
+            if self.added_links.pop(link["id"], None) is None:
+                self.removed_links.append(link["id"])
+        self.patched_nodes.clear()
         self.nodes.clear()
-        self.node_names.clear()
+        self.node_index.clear()
         self.links.clear()
 
-    def add_node(self, name : str, tag : str):
-        self.nodes.append({"id" : f"id_{tag}", "tag" : tag, "name" : name, "x": 600, "y": 400})
-        self.node_names.append(name)
-
-    def has_added(self, name : str):
-        return name in self.node_names
+    def sync(self, nodes : list[dict], links : list[tuple[str, str]]):
+        """
+        把图变为给定的节点与连线, 只把差异记为增量
+        节点已经存在时保留位置, 只修改变化的属性
+        """
+        wanted = {node["id"]: node for node in nodes}
+        wanted_links = {f"{a}->{b}": (a, b) for a, b in links}
 
-    def add_link(self, a : str, b : str):
-        self.links.append({"source": f"id_{a}", "target": f"id_{b}"})
+        for link in self.links:
+            if link["id"] not in wanted_links and self.added_links.pop(link["id"], None) is None:
+                self.removed_links.append(link["id"])
+        self.links = [link for link in self.links if link["id"] in wanted_links]
+        for node in self.nodes:
+            if node["id"] not in wanted:
+                self.patched_nodes.pop(node["id"], None)
+                if self.added_nodes.pop(node["id"], None) is None:
+                    self.removed_nodes.append(node["id"])
+                del self.node_index[node["id"]]
+        self.nodes = [node for node in self.nodes if node["id"] in wanted]
+
+        for node_id, attrs in wanted.items():
+            node = self.node_index.get(node_id)
+            if node is None:
+                node = dict(attrs, x=GraphLayout.WIDTH / 2, y=GraphLayout.HEIGHT / 2)
+                self.nodes.append(node)
+                self.node_index[node_id] = node
+                self.added_nodes[node_id] = node
+            else:
+                changed = {key: value for key, value in attrs.items() if node.get(key) != value}
+                if changed:
+                    node.update(changed)
+                    self.patch_node(node_id, **changed)
+        existing = {link["id"] for link in self.links}
+        for link_id, (a, b) in wanted_links.items():
+            if link_id not in existing:
+                link = {"id": link_id, "source": a, "target": b}
+                self.links.append(link)
+                self.added_links[link_id] = link
 
 
 class GraphWindow(QMainWindow):
@@ -107,7 +221,9 @@ class GraphWindow(QMainWindow):
         self.browser.page().setWebChannel(self.channel)
         self.channel.registerObject("nodeData", self.node_data)
 
-        self.browser.setHtml(self.generate_html())
+        # 页面与d3等资源都由 app:// 协议提供, 见 question/site/graph.html
+        AppScheme.install(self.browser.page().profile())
+        self.browser.setUrl(AppScheme.url("site/graph.html"))
 
         container = QWidget()
         layout = QVBoxLayout()
@@ -126,46 +242,18 @@ class GraphWindow(QMainWindow):
             QSizePolicy.Policy.Expanding
         )
 
-        self.question_lib = Questions.QuestionsManager().load_lib(r"题型预测/question.json")
+        self.question_lib = Questions.shared_lib(r"题型预测/question.json")
+        self.tag_tree = TagTree.TagTree(self.question_lib)
         self.browser.loadFinished.connect(self.init_webchannel)
         self.browser.loadFinished.connect(self.resend_data)
         # QTimer.singleShot(1000, self.send_initial_data)
         self.node_data.refresh_graph()
 
     def send_initial_data(self):
-        """生成目录"""
-        self.node_data.clear()
-        all_tags = set()
-        for _, each_ques in self.question_lib.questions_dir.values():
-            for tag in each_ques.tags:
-                all_tags.add(tag)
-
-        tag0 = None
-        for tag in all_tags:
-            self.node_data.add_node(tag, f"menu::{tag}")
-            if tag0 is not None:
-                self.node_data.add_link(f"menu::{tag0}", f"menu::{tag}")
-            tag0 = tag
-
-        self.node_data.updateGraph.emit(json.dumps({
-            "nodes": self.node_data.nodes,
-            "links": self.node_data.links
-        }))
-
-        self.node_data.refresh_graph()
-
-    def add_one_tag(self, tag : str):
-        same_tag_list = [q for _, q in self.question_lib.questions_dir.values() if tag in q.tags]
-        same_tag_list.sort(key=lambda x: {"简单": 1, "中等": 2, "困难": 3, "空": 4}[x.difficulty])
-
-        q1 = Questions.Question()
-        q1.question_id = "exit"
-        q1.surface = "exit                 "
-        for q in same_tag_list:
-            self.node_data.add_node(q1.surface[0:min(len(q1.surface), 5)], q1.question_id)
-            self.node_data.add_link(q1.question_id, q.question_id)
-            q1 = q
-        self.node_data.add_node(q1.surface[0:min(len(q1.surface), 5)], q1.question_id)
+        """生成目录: 只发送目录树中当前展开的部分"""
+        nodes, links = self.tag_tree.visible()
+        self.node_data.sync(nodes, links)
+        self.node_data.flush()
 
     def init_webchannel(self):
         """ 窗口尺寸变化时通知前端 """
@@ -183,265 +271,9 @@ class GraphWindow(QMainWindow):
         else:
             print("[PY] 错误：WebChannel未就绪")
 
-    def generate_html(self):
-        code =  f"""
-        <!DOCTYPE html>
-        <html>
-        <html style="width:100%; height:100%; margin:0; padding:0;">
-        <head>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
-            <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
-            <script >{d3_js}</script>
-            <style>
-                .node-group {{
-                    cursor: move;
-                    transition: transform 0.2s;
-                }}
-                .node-circle {{
-                    fill: #2196F3;
-                    transition: r 0.2s;
-                }}
-                .node-text {{
-                    fill: white;
-                    font-size: 12px;
-                    text-anchor: middle;
-                    user-select: none;
-                    filter: drop-shadow(1px 1px 1px rgba(0,0,0,0.5));
-                }}
-                .link {{
-                    stroke: #666;
-                    stroke-width: 2;
-                }}
-                svg {{
-                    border: 1px solid #eee;
-                    background-color: #f9f9f9;
-                }}
-            </style>
-        </head>
-        <body>
-            <div id="graph"></div>
-            <script>
-                // 初始化状态标志
-                let isChannelReady = false;
-                let isD3Ready = false;
-                let simulation, svg;
-                let webChannelLoaded = false;
-                let d3Loaded = false;
-            
-
-                // 错误处理
-                window.onerror = function(msg, src, line) {{
-                    console.error("[全局错误]", msg, "at", src, "line", line);
-                }};
-                
-                window.addEventListener('windowResize', (e) => {{
-                    const newWidth = e.detail.width;
-                    const newHeight = e.detail.height;
-    
-                    // 更新画布尺寸
-                    svg.attr("width", newWidth)
-                       .attr("height", newHeight);
-
-                    // 更新力导向参数
-                    simulation.force("center", d3.forceCenter(newWidth/2, newHeight/2))
-                             .force("x", d3.forceX(newWidth/2).strength(0.05))
-                             .force("y", d3.forceY(newHeight/2).strength(0.05))
-                             .alpha(0.5).restart();
-                }});
-
-                // D3可用性检查
-                document.addEventListener('DOMContentLoaded', () => {{
-                    if(typeof d3 !== 'undefined') {{
-                        isD3Ready = true;
-                    }} else {{
-                        console.error('D3.js加载失败');
-                    }}
-                }});
-
-                // Qt WebChannel初始化
-                new QWebChannel(qt.webChannelTransport, (channel) => {{
-                    console.log('WebChannel初始化完成', channel.objects);
-                    window.nodeData = channel.objects.nodeData;
-                    console.log('nodeData对象可用性', typeof window.nodeData.updateGraph);
-                    webChannelLoaded = true;
-                    checkInit();
-                }});
-
-
-
-                if (typeof d3 !== 'undefined') {{
-                    console.log('D3.js已加载');
-                    d3Loaded = true;
-                    checkInit();
-                }} else {{
-                    console.error('D3.js未加载！');
-                }}
-                function checkInit() {{
-                    console.log('检查初始化状态，webChannelLoaded:', webChannelLoaded, 'd3Loaded:', d3Loaded);
-                    if (webChannelLoaded && d3Loaded) {{
-                        console.log('全部依赖加载完成，开始初始化');
-                        realInitialize();
-                    }}
-                }}
-
-                // 统一初始化入口
-                function realInitialize() {{
-
-                    console.log('开始初始化D3图表');
-                    
-                    if(window.existingSimulation) {{
-                        window.existingSimulation.stop();
-                        window.existingSimulation = null;
-                    }}
-
-                    // 绑定数据更新信号
-                    window.nodeData.updateGraph.connect(function(data) {{
-                        console.log('接收到新数据:', data);
-                        try {{
-                            const graph =
-                            JSON.parse(data);
-                            updateGraph(graph);
-                        }} catch (e) {{
-                            console.error('解析数据失败:', e);
-                        }}
-                    }});
-
-
-                    // 创建SVG画布
-                    const width = 1200, height = 800;
-                    svg = d3.select("#graph")
-                        .append("svg")
-                        .attr("width", width)
-                        .attr("height", height);
-
-                    // 初始化力导向模拟
-                        simulation = d3.forceSimulation()
-                            .force("link", d3.forceLink().id(d => d.id).distance(150))
-                            .force("charge", d3.forceManyBody().strength(-120))
-                            .force("collide", d3.forceCollide().radius(30))
-                            .force("center", d3.forceCenter(width/2, height/2))
-                            .force("x", d3.forceX(width/2).strength(0.05))
-                            .force("y", d3.forceY(height/2).strength(0.05))
-                            .alphaDecay(0.05)  // 降低冷却速度
-                            .velocityDecay(0.4);  
-
-                    // 绑定位置同步事件
-                    window.nodeData.positionChanged.connect(function(data) {{
-                        simulation.nodes(JSON.parse(data));
-                        simulation.alpha(0.3).restart();
-                    }});
-                
-                    window.existingSimulation = simulation;
-
-              }}
-
-                // 拖拽处理函数
-                function dragHandler() {{
-                    function dragstart(event, d) {{
-                        if (!event.active) simulation.alphaTarget(0.3).restart();
-                        d.fx = d.x;
-                        d.fy = d.y;
-                    }}
-
-                    function dragging(event, d) {{
-                        d.fx = event.x;
-                        d.fy = event.y;
-                        window.nodeData.handlePositionChange(d.id, d.fx, d.fy);
-                    }}
-
-                    function dragend(event, d) {{
-                        if (!event.active) simulation.alphaTarget(0);
-                        d.fx = null;
-                        d.fy = null;
-                    }}
-
-                    return d3.drag()
-                        .on("start", dragstart)
-                        .on("drag", dragging)
-                        .on("end", dragend);
-                }}
-
-                // 图形更新函数
-                function updateGraph(graph) {{
-                    // 更新连线
-                    const links = svg.selectAll(".link")
-                        .data(graph.links)
-                        .join("line")
-                        .attr("class", "link");
-
-                    // 更新节点组
-                    const nodeGroups = svg.selectAll(".node-group")
-                        .data(graph.nodes, d => d.id)
-                        .join("g")
-                        .attr("class", "node-group")
-                        .call(dragHandler())
-                        .on("click", function(event, d) {{  // 新增点击事件
-                            console.log("[前端] 节点被点击，Tag:", d.tag);
-                            window.nodeData.handleNodeClick(d.tag);
-                            event.stopPropagation();
-                        }});
-
-                    // 更新圆形节点
-                    nodeGroups.selectAll(".node-circle")
-                        .data(d => [d])
-                        .join("circle")
-                        .attr("class", "node-circle")
-                        .attr("r", 30)
-                        .on("mouseover", function() {{
-                            d3.select(this).transition().attr("r", 25);
-                        }})
-                        .on("mouseout", function() {{
-                            d3.select(this).transition().attr("r", 20);
-                        }})
-
-                    // 更新节点文字
-                    nodeGroups.selectAll(".node-text")
-                        .data(d => [d])
-                        .join("text")
-                        .attr("class", "node-text")
-                        .attr("dy", "0.3em")
-                        .text(d => d.name)
-                        .style("font-size", d => {{
-                            const length = d.tag.length;
-                            if (length > 15) return "8px";
-                            if (length > 10) return "10px";
-                            return "12px";
-                        }});
-
-                    // 绑定力导向模拟
-                    simulation.nodes(graph.nodes);
-                    simulation.force("link").links(graph.links);
-                    simulation.force("collide").strength(0.7);
-
-                    simulation.on("tick", () => {{
-                        links.attr("x1", d => d.source.x)
-                            .attr("y1", d => d.source.y)
-                            .attr("x2", d => d.target.x)
-                            .attr("y2", d => d.target.y);
-                        const width = 1200, height = 800;
-                        nodeGroups.attr("transform", d => `translate(${{d.x}},${{d.y}})`)
-                            .each(function(d) {{
-                            const node = d3.select(this);
-                            const isNearEdge = d.x < 30 || d.x > width-30 || 
-                                            d.y < 30 || d.y > height-30;
-                            node.attr("fill", isNearEdge ? "red" : "#2196F3");
-                        }});
-                    }});
-                    
-                    
-
-                    simulation.alpha(1).restart();
-                }}
-            </script>
-        </body>
-        </html>
-        """
-
-        # print(code)
-        return code
-
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后的程序中, 子进程(沙箱/预渲染)不重新启动界面
     app = QApplication(sys.argv)
     window = GraphWindow()
     window.show()
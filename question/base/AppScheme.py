@@ -0,0 +1,120 @@
+"""
+app:// 协议, 页面用到的静态资源(d3, qwebchannel.js, 样式, 右侧栏模板)都从这里按URL加载
+资源读取一次后缓存在内存中, 并带上缓存响应头, 浏览器可以缓存编译后的脚本
+注意: register_scheme 必须在创建 QApplication 之前调用, 导入本模块时会自动调用
+"""
+import logging
+import mimetypes
+import os
+
+from PyQt6.QtCore import QBuffer, QByteArray, QFile, QIODevice, QUrl
+from PyQt6.QtWebEngineCore import (QWebEngineProfile, QWebEngineUrlRequestJob, QWebEngineUrlScheme,
+                                   QWebEngineUrlSchemeHandler)
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+SCHEME = b"app"
+HOST = "local"
+SITE_DIR = os.path.join("question", "site")
+MAX_AGE = 3600  # 秒
+
+# 不在 site 目录下的资源
+FILES = {
+    "lib/d3.v7.min.js": os.path.join("question", "base", "d3.v7.min.js"),
+    "lib/qwebchannel.js": ":/qtwebchannel/qwebchannel.js",  # Qt资源文件中的版本, 与当前的QtWebChannel匹配
+}
+
+_cache : dict[str, tuple[bytes, bytes]] = {}
+#             路径 : (mime, 内容)
+_handler : "AppSchemeHandler | None" = None
+
+
+def register_scheme():
+    if bytes(QWebEngineUrlScheme.schemeByName(SCHEME).name()) == SCHEME:
+        return
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme
+                    | QWebEngineUrlScheme.Flag.LocalAccessAllowed
+                    | QWebEngineUrlScheme.Flag.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def url(path : str) -> QUrl:
+    """例如 url("site/graph.html") -> app://local/site/graph.html"""
+    return QUrl(f"{SCHEME.decode()}://{HOST}/{path.lstrip('/')}")
+
+
+def _file_path(path : str) -> str | None:
+    if path in FILES:
+        return FILES[path]
+    if path.startswith("site/"):
+        site = os.path.abspath(SITE_DIR)
+        file_path = os.path.abspath(os.path.join(site, path[len("site/"):]))
+        if file_path.startswith(site + os.sep):  # 不允许用 .. 访问目录外的文件
+            return file_path
+    return None
+
+
+def read(path : str) -> tuple[bytes, bytes]:
+    """
+    :return: (mime, 内容), 同一个资源只读取一次
+    :raise FileNotFoundError: 资源不存在
+    """
+    if path in _cache:
+        return _cache[path]
+    file_path = _file_path(path)
+    if file_path is None:
+        raise FileNotFoundError(path)
+    if file_path.startswith(":/"):
+        file = QFile(file_path)
+        if not file.open(QIODevice.OpenModeFlag.ReadOnly):
+            raise FileNotFoundError(path)
+        data = bytes(file.readAll())
+        file.close()
+    else:
+        with open(file_path, "rb") as file:
+            data = file.read()
+    mime = (mimetypes.guess_type(file_path)[0] or "application/octet-stream").encode()
+    _cache[path] = (mime, data)
+    return _cache[path]
+
+
+def read_text(path : str) -> str:
+    return read(path)[1].decode("utf-8")
+
+
+class AppSchemeHandler(QWebEngineUrlSchemeHandler):
+    def requestStarted(self, job : QWebEngineUrlRequestJob):
+        path = job.requestUrl().path().lstrip("/")
+        try:
+            mime, data = read(path)
+        except OSError as e:
+            logger.error(f"找不到资源 {job.requestUrl().toString()} : {e}")
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        if hasattr(job, "setAdditionalResponseHeaders"):  # Qt 6.6 以后才有
+            job.setAdditionalResponseHeaders({
+                QByteArray(b"Cache-Control"): QByteArray(f"max-age={MAX_AGE}".encode())
+            })
+        buffer = QBuffer(job)  # 随请求一起释放
+        buffer.setData(data)
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(mime, buffer)
+
+
+def install(profile : QWebEngineProfile | None = None):
+    """在 profile (默认为默认profile) 上安装处理器, 需要在 QApplication 创建之后调用"""
+    global _handler
+    profile = profile or QWebEngineProfile.defaultProfile()
+    if profile.urlSchemeHandler(SCHEME) is not None:
+        return
+    if _handler is None:
+        _handler = AppSchemeHandler()
+    profile.installUrlSchemeHandler(SCHEME, _handler)
+
+
+register_scheme()
@@ -1,12 +1,18 @@
 import logging
 import math
+import multiprocessing
 import sys
+import threading
 from collections import defaultdict
+from fractions import Fraction
 
 import matplotlib
 import matplotlib.pyplot as plt
 import numpy
-from PyQt6 import QtCore, QtWidgets
+from PyQt6 import QtCore, QtGui, QtWidgets
+from PyQt6.QtCore import pyqtSignal
+
+from question.base import SafeEval, SequenceEngine
 
 matplotlib.use("QtAgg")
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -17,6 +23,42 @@ logging.basicConfig(format='%(levelname)s:%(message)s')
 logger.setLevel(logging.DEBUG)
 
 
+def shorten(text : str, limit : int = 60) -> str:
+    """很长的精确值只显示开头与结尾"""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit // 2]}...{text[-limit // 2:]} ({len(text)}个字符)"
+
+
+def format_value(value, limit : int = 60) -> str:
+    """
+    显示用的简短文本; 很大的整数不转换为完整的文本(Python默认不允许把超过4300位的整数转换为文本, 而且很慢),
+    只显示有效数字与位数
+    """
+    if isinstance(value, Fraction):
+        return f"{format_value(value.numerator, limit // 2)}/{format_value(value.denominator, limit // 2)}"
+    if isinstance(value, int) and abs(value).bit_length() > 4 * limit:  # 超过约1.2*limit位
+        exponent = math.log10(abs(value))
+        digits = int(exponent) + 1
+        if digits > limit:
+            mantissa = 10 ** (exponent - int(exponent))
+            return f"{'-' if value < 0 else ''}{mantissa:.8f}e+{int(exponent)} ({digits}位)"
+    return shorten(str(value), limit)
+
+
+def full_text(value) -> str:
+    """完整的文本, 暂时解除整数位数的限制"""
+    get_limit = getattr(sys, "get_int_max_str_digits", None)
+    if get_limit is None:  # Python 3.11 之前没有这个限制
+        return str(value)
+    old_limit = get_limit()
+    sys.set_int_max_str_digits(0)
+    try:
+        return str(value)
+    finally:
+        sys.set_int_max_str_digits(old_limit)
+
+
 class MplCanvas(FigureCanvas):
 
     def __init__(self, parent=None):
@@ -24,8 +66,7 @@ class MplCanvas(FigureCanvas):
         fig, self.ax = plt.subplots()
         super().__init__(fig)
 
-        self.x = numpy.arange(0, 10, 1)
-        self.y = 2 * self.x + 1
+        self.y = 2 * numpy.arange(0, 10, 1) + 1
         self.ax.scatter(self.x, self.y, label='2x + 1')
         self.ax.set_title('Matplotlib in PyQt6')
         self.ax.set_xlabel('n')
@@ -38,6 +79,7 @@ class MplCanvas(FigureCanvas):
                                       bbox=dict(boxstyle="round", fc="w"),
                                       arrowprops=dict(arrowstyle="->"))
         self.annot.set_visible(False)
+        self.error : SafeEval.EvalError | None = None  # 上一次计算的错误
 
         # 连接鼠标移动事件
         self.mpl_connect("motion_notify_event", self.hover)
@@ -47,56 +89,52 @@ class MplCanvas(FigureCanvas):
         seq_type = set_dir['mode']
         n = max(int(set_dir['max_index']), 10)
         expr = command.strip()
-        if seq_type == 1:
-            # 处理递推式
-
-            initial = set_dir['init_number']
-
-            a = initial.copy()
-            current_length = len(initial)
-
-            if n <= current_length:
-                return numpy.array(a[:n])
-
-            for k in range(current_length, n):
-                context = {
-                    'a': a,
-                    'n': k,
-                    'math': math
-                }
-                try:
-                    current = eval(expr, context, math.__dict__)
-                    a.append(current)
-                except IndexError as e:
-                    logger.error(f"初始项设置错误 : {e}")
-                except Exception as e:
-                    logger.error(f"计算递推式时出错：{e}")
-
-        elif seq_type == 2:
-            # 处理通项公式
-            a = []
-            for k in range(n):
-                context = {
-                    'n': k,
-                    'math': math
-                }
-                try:
-                    current = eval(expr, context, math.__dict__)
-                    a.append(current)
-                except Exception as e:
-                    logger.error(f"计算通项时出错：{e}")
-        else:
-            logger.error("类型错误")
-            return None
+        self.error = None
+        # 递推式与通项公式都只编译一次, 能整体计算的整体计算; 在沙箱进程中执行, 超时或计算量过大时报错
+        try:
+            a = SafeEval.run(SequenceEngine.compute_values, seq_type, expr, tuple(set_dir['init_number'] or ()), n,
+                             set_dir['backend'] or "float", set_dir['precision'])
+        except SafeEval.EvalError as e:
+            logger.error(f"{'递推式' if seq_type == 1 else '通项公式'}有误 : {e}")
+            self.error = e
+            return False
 
         self.y = numpy.array(a)
         logger.debug("set_y done")
+        return True
+
+    @property
+    def y(self) -> numpy.ndarray:
+        """已经画出的各项; 按段保存, 用到时才连接成一个数组, 避免每来一段就复制全部"""
+        if len(self.y_chunks) > 1:
+            self.y_chunks = [numpy.concatenate(self.y_chunks)]
+        return self.y_chunks[0] if self.y_chunks else numpy.empty(0)
+
+    @y.setter
+    def y(self, values):
+        self.y_chunks = [numpy.asarray(values, dtype=numpy.float64)]
+        self.count = len(self.y_chunks[0])
+
+    @property
+    def x(self) -> numpy.ndarray:
+        return numpy.arange(self.count)
 
     def update_image(self, command : str):
+        """在当前线程中计算并绘制, 界面中使用 MainWindow 的后台计算"""
         logger.debug("update_image")
-        self.set_y(command)
-        n = max(int(set_dir['max_index']), 10)
-        self.x = numpy.arange(0, n, 1)
+        if not self.set_y(command):
+            return
+        y = self.y
+        self.begin_plot(command, len(y))
+        self.add_values(y)
+        self.end_plot()
+        logger.debug("update_image done")
+
+    def begin_plot(self, command : str, total : int):
+        """清空画布, 之后用 add_values 分段加入结果"""
+        self.y = numpy.empty(0)
+        self.exact = []  # 非float64时的原始值, 鼠标悬停时显示
+        self.command = command
         self.ax.clear()
         # 重新创建annot对象
         self.annot = self.ax.annotate(
@@ -105,27 +143,75 @@ class MplCanvas(FigureCanvas):
             bbox=dict(boxstyle="round", fc="w"),
             arrowprops=dict(arrowstyle="->")
         )
-        self.ax.scatter(self.x, self.y, label=command)
+        self.annot.set_visible(False)
         self.ax.set_title(command)
+        self.ax.set_xlim(-1, total)  # 横轴不随已经算出的项数变化
+        self.draw_idle()
+
+    def add_values(self, values : numpy.ndarray | list):
+        """values 为 SequenceEngine.iter_values 给出的一段"""
+        if not isinstance(values, numpy.ndarray):
+            self.exact.extend(values)
+        values = SequenceEngine.to_floats(values)
+        start = self.count
+        x = numpy.arange(start, start + len(values))
+        self.y_chunks.append(values)
+        self.count += len(values)
+        self.ax.scatter(x, values, color="C0", label=self.command if start == 0 else None)
+        self.draw_idle()  # 多段结果连续到达时合并为一次重绘
+
+    def end_plot(self):
         self.ax.legend()
-        self.annot.set_visible(False)
-        self.draw()
-        logger.debug("update_image done")
+        self.draw_idle()
 
     def hover(self, event):
         if event.inaxes == self.ax:
             # 获取鼠标位置
             x, y = event.xdata, event.ydata
             # 查找最近的点
-            if x is not None and y is not None:
-                index = (numpy.abs(self.x - x)).argmin()
-                self.annot.xy = (self.x[index], self.y[index])
-                self.annot.set_text(f'n : {self.x[index]}\na[n] : {self.y[index]}')
+            if x is not None and y is not None and self.count:
+                index = min(max(round(x), 0), self.count - 1)  # 横坐标就是项数
+                self.annot.xy = (index, self.y[index])
+                value = self.exact[index] if index < len(self.exact) else self.y[index]
+                self.annot.set_text(f'n : {index}\na[n] : {format_value(value)}')
                 self.annot.set_visible(True)
-                self.draw()
-        else:
+                self.draw_idle()
+        elif self.annot.get_visible():
             self.annot.set_visible(False)
-            self.draw()
+            self.draw_idle()
+
+
+class JobSignals(QtCore.QObject):
+    """后台计算的结果, 第一个参数为任务的编号"""
+    chunk = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+
+class SandboxJob(QtCore.QRunnable):
+    """在线程池中调用 SafeEval.run, 结果通过 signals 送回主线程; cancel 后沙箱进程会被结束"""
+
+    def __init__(self, generation : int, signals : JobSignals, func, *args):
+        super().__init__()
+        self.generation = generation
+        self.signals = signals
+        self.func = func
+        self.args = args
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return  # 排队时已经取消, 不必启动计算(取消正在进行的计算要重启沙箱进程)
+        try:
+            value = SafeEval.run(self.func, *self.args, cancelled=self.cancelled.is_set,
+                                 on_chunk=lambda chunk: self.signals.chunk.emit(self.generation, chunk))
+        except SafeEval.EvalError as e:
+            self.signals.failed.emit(self.generation, e)
+        else:
+            self.signals.finished.emit(self.generation, value)
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -164,23 +250,140 @@ class MainWindow(QtWidgets.QMainWindow):
         self.button_setting = Button_setting
         h_layout.addWidget(self.button_setting)
 
+        #计算单独一项
+        Button_term = QtWidgets.QPushButton("计算单项", self)
+        Button_term.clicked.connect(self.compute_term)
+        h_layout.addWidget(Button_term)
+
+        # 公式有误时显示错误
+        self.error_label = QtWidgets.QLabel(central_widget)
+        self.error_label.setStyleSheet("color: red")
+        self.error_label.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))  # 位置标记要对齐
+        self.error_label.setVisible(False)
+
         # 创建 Matplotlib 画布并添加到布局
         self.canvas = MplCanvas(self)
 
         v_layout.addLayout(h_layout)
+        v_layout.addWidget(self.error_label)
         v_layout.addWidget(self.canvas)
 
         self.settings_page = SettingsPage()
 
+        # 后台计算: 沙箱进程一次只算一个公式, 只用一个线程; 只显示最新一次计算的结果
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.generation = 0
+        self.job : SandboxJob | None = None
+        self.plot_signals = JobSignals(self)
+        self.plot_signals.chunk.connect(self.plot_chunk)
+        self.plot_signals.finished.connect(self.plot_finished)
+        self.plot_signals.failed.connect(self.plot_failed)
+        self.term_signals = JobSignals(self)
+        self.term_signals.finished.connect(self.term_finished)
+        self.term_signals.failed.connect(self.term_failed)
+        self.lineEdit.textEdited.connect(self.cancel_job)  # 公式改了, 正在算的结果不再需要
+
     def update_image(self):
+        """在后台计算, 结果分段画到画布上"""
         command = self.lineEdit.text()
         print(command)
-        self.canvas.update_image(command)
-        self.update()
+        self.cancel_job()
+        n = max(int(set_dir['max_index']), 10)
+        self.command = command
+        self.plotted = False
+        self.job = SandboxJob(self.generation, self.plot_signals, SequenceEngine.iter_values,
+                              set_dir['mode'], command.strip(), tuple(set_dir['init_number'] or ()), n,
+                              set_dir['backend'] or "float", set_dir['precision'])
+        self.pool.start(self.job)
+        self.statusBar().showMessage("计算中...")
+
+    def cancel_job(self):
+        self.generation += 1  # 旧任务之后送来的结果都会被忽略
+        if self.job is not None:
+            self.job.cancel()  # 还没开始的任务直接结束, 排在后面的单项计算照常执行
+            self.job = None
+
+    def plot_chunk(self, generation : int, values : numpy.ndarray):
+        if generation != self.generation:
+            return
+        if not self.plotted:
+            self.canvas.begin_plot(self.command, max(int(set_dir['max_index']), 10))
+            self.plotted = True
+        self.canvas.add_values(values)
+        self.statusBar().showMessage(f"已计算{self.canvas.count}项...")
+
+    def plot_finished(self, generation : int, _):
+        if generation != self.generation:
+            return
+        self.job = None
+        self.canvas.end_plot()
+        self.show_error(None)
+        self.statusBar().showMessage(f"共{self.canvas.count}项", 3000)
+
+    def plot_failed(self, generation : int, error : SafeEval.EvalError):
+        if generation != self.generation:
+            return
+        logger.error(f"{'递推式' if set_dir['mode'] == 1 else '通项公式'}有误 : {error}")
+        self.job = None
+        self.show_error(error, self.command)
+        self.statusBar().clearMessage()
+
+    def show_error(self, error : SafeEval.EvalError | None, command : str = ""):
+        """显示错误类型与信息, 知道位置时在公式下标出"""
+        if error is None:
+            self.error_label.setVisible(False)
+            return
+        text = str(error)
+        if error.position is not None and command:
+            text += f"\n{command.strip()}\n{' ' * error.position}^"
+        self.error_label.setText(text)
+        self.error_label.setVisible(True)
+
+    def showEvent(self, a0):
+        # 打开计算器时才启动沙箱进程, 练习窗口中创建但没有打开的计算器不启动; 第一次计算时不用等待进程启动
+        SafeEval.sandbox().start()
+        super().showEvent(a0)
+
+    def closeEvent(self, a0):
+        self.cancel_job()  # 线程池退出前要等正在执行的任务
+        super().closeEvent(a0)
 
     def open_setting(self):
         self.settings_page.show()
 
+    def compute_term(self):
+        """计算很远的一项, 例如 a[10^9], 线性递推式用矩阵快速幂"""
+        text, ok = QtWidgets.QInputDialog.getText(self, "计算单项", "项数n (可以写成10^9, 求模m的值写成 n % m)")
+        if not ok or not text.strip():
+            return
+        command = self.lineEdit.text()
+        try:
+            index_text, _, modulus_text = text.partition("%")
+            index = SequenceEngine.parse_index(index_text)
+            modulus = SequenceEngine.parse_index(modulus_text) if modulus_text.strip() else None
+        except SafeEval.EvalError as e:
+            QtWidgets.QMessageBox.warning(self, "计算单项", f"项数有误 : {e}")
+            return
+        self.term_request = (text.strip(), command)
+        self.pool.start(SandboxJob(0, self.term_signals, SequenceEngine.compute_term, set_dir['mode'],
+                                   command.strip(), tuple(set_dir['init_number'] or ()), index, modulus,
+                                   set_dir['backend'] or "float", set_dir['precision']))
+
+    def term_finished(self, _, value):
+        self.show_error(None)
+        text = format_value(value)
+        box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Icon.Information, "计算单项",
+                                    f"a[{self.term_request[0]}] = {text}", parent=self)
+        full = full_text(value)
+        if full != text:
+            box.setDetailedText(full)  # 完整的精确值, 可以复制
+        box.exec()
+
+    def term_failed(self, _, error : SafeEval.EvalError):
+        self.show_error(error, self.term_request[1])
+        QtWidgets.QMessageBox.warning(self, "计算单项", f"无法计算 : {error}")
+
 
 class SettingsPage(QtWidgets.QWidget):
     def __init__(self):
@@ -211,7 +414,7 @@ class SettingsPage(QtWidgets.QWidget):
         h2_layout.addWidget(h2_input)
 
         self.init_input = h2_input
-        set_dir["init_number"] = [1, 2]
+        set_dir["init_number"] = ["1", "2"]  # 保存文本, 计算时按数值类型转换, 可以写成分数 1/3
 
         h3_layout = QtWidgets.QHBoxLayout()
         h3_label = QtWidgets.QLabel("计算项数(最小为10)")
@@ -222,9 +425,31 @@ class SettingsPage(QtWidgets.QWidget):
         self.max_number_input = h3_input
         set_dir["max_index"] = 10
 
+        h4_layout = QtWidgets.QHBoxLayout()
+        h4_label = QtWidgets.QLabel("数值类型")
+        self.backend_input = QtWidgets.QComboBox()
+        for text, backend in (("浮点数(float64)", "float"), ("精确(整数与分数)", "exact"), ("高精度小数(decimal)", "decimal")):
+            self.backend_input.addItem(text, backend)
+        self.backend_input.currentIndexChanged.connect(self.change_backend)
+        h4_layout.addWidget(h4_label)
+        h4_layout.addWidget(self.backend_input)
+        set_dir["backend"] = "float"
+
+        h5_layout = QtWidgets.QHBoxLayout()
+        h5_label = QtWidgets.QLabel("有效数字位数(decimal)")
+        self.precision_input = QtWidgets.QSpinBox()
+        self.precision_input.setRange(1, 1000)
+        self.precision_input.setValue(SequenceEngine.DEFAULT_PRECISION)
+        self.precision_input.setEnabled(False)
+        h5_layout.addWidget(h5_label)
+        h5_layout.addWidget(self.precision_input)
+        set_dir["precision"] = SequenceEngine.DEFAULT_PRECISION
+
         main_layout.addLayout(h1_layout)
         main_layout.addLayout(h2_layout)
         main_layout.addLayout(h3_layout)
+        main_layout.addLayout(h4_layout)
+        main_layout.addLayout(h5_layout)
 
         self.setLayout(main_layout)
 
@@ -233,11 +458,19 @@ class SettingsPage(QtWidgets.QWidget):
         set_dir["mode"] = set_dir["possible_mode"][now_mode_idx]
         self.mode_Button.setText({1: "递推式", 2: "通项公式"}[set_dir["mode"]])
 
+    def change_backend(self):
+        self.precision_input.setEnabled(self.backend_input.currentData() == "decimal")
+
     def update_setting(self):
         try:
-            set_dir["init_number"] = list(map(float, self.init_input.text().split(" ")))
+            texts = self.init_input.text().split()
+            for text in texts:
+                Fraction(text)  # 检查格式, 转换留给计算时按数值类型进行
+            set_dir["init_number"] = texts
         except Exception as e:
             logger.error(f"初始化初始项数组 : {e}")
+        set_dir["backend"] = self.backend_input.currentData()
+        set_dir["precision"] = self.precision_input.value()
         try:
             set_dir["max_index"] = max(int(self.max_number_input.text()), 10)
         except Exception as e:
@@ -248,6 +481,7 @@ class SettingsPage(QtWidgets.QWidget):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后的程序中, 子进程(沙箱/预渲染)不重新启动界面
     app = QtWidgets.QApplication(sys.argv)
     window = MainWindow()
     window.show()
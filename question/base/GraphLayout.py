@@ -0,0 +1,202 @@
+"""
+在Python端预先计算目录图的布局, 前端打开时节点直接出现在算好的位置
+力导向布局 (Fruchterman-Reingold), 节点多时斥力按网格单元的质心近似
+布局按图的hash缓存在磁盘上, 拖动后的位置也会写回缓存, 下次打开时保持原样
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+
+import numpy
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+WIDTH, HEIGHT = 1200, 800
+LINK_DISTANCE = 150
+GRAVITY = 0.5  # 把节点拉向中心, 避免离散的子图飘出画布
+EXACT_LIMIT = 400  # 超过这个节点数时斥力用网格近似
+MAX_CELLS = 24  # 网格每边的单元数上限
+DEFAULT_CACHE = os.path.join("cache", "layout")
+MAX_CACHED_LAYOUTS = 200  # 缓存目录中最多保留的布局数, 超出时删除最久没有用过的
+
+Positions = dict[str, tuple[float, float]]
+
+
+def graph_hash(node_ids, links) -> str:
+    """与节点和连线的顺序无关"""
+    h = hashlib.sha1()
+    for node_id in sorted(map(str, node_ids)):
+        h.update(node_id.encode("utf-8") + b"\0")
+    h.update(b"\1")
+    for source, target in sorted((str(s), str(t)) for s, t in links):
+        h.update(source.encode("utf-8") + b"\0" + target.encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def _pull_away(pos : numpy.ndarray, sources : numpy.ndarray, mass : numpy.ndarray, k : float) -> numpy.ndarray:
+    """
+    每个点受到sources的斥力之和 sum(mass * k^2 * (p - q) / |p - q|^2)
+    展开成矩阵乘法, 不需要生成 n*m*2 的中间数组
+    """
+    disp = numpy.zeros_like(pos)
+    sq_sources = (sources ** 2).sum(axis=1)
+    for start in range(0, len(pos), 1024):
+        p = pos[start:start + 1024]
+        dist2 = (p ** 2).sum(axis=1)[:, None] + sq_sources[None, :] - 2 * p @ sources.T
+        weight = mass[None, :] / numpy.maximum(dist2, 1e-2)
+        disp[start:start + 1024] = k * k * (p * weight.sum(axis=1)[:, None] - weight @ sources)
+    return disp
+
+
+def _repulsion(pos : numpy.ndarray, k : float) -> numpy.ndarray:
+    n = len(pos)
+    if n <= EXACT_LIMIT:
+        return _pull_away(pos, pos, numpy.ones(n), k)
+
+    # 网格近似: 每个单元视为位于质心, 质量为节点数的一个大节点
+    cells = min(max(int(math.sqrt(n / 8)), 1), MAX_CELLS)
+    low, high = pos.min(axis=0), pos.max(axis=0)
+    size = numpy.maximum(high - low, 1e-6) / cells
+    cell_xy = numpy.minimum(((pos - low) / size).astype(int), cells - 1)
+    cell = cell_xy[:, 0] * cells + cell_xy[:, 1]
+    counts = numpy.bincount(cell, minlength=cells * cells).astype(float)
+    centroid = numpy.zeros((cells * cells, 2))
+    numpy.add.at(centroid, cell, pos)
+    occupied = counts > 0
+    return _pull_away(pos, centroid[occupied] / counts[occupied, None], counts[occupied], k)
+
+
+def force_layout(node_ids : list[str], links : list[tuple[str, str]], fixed : Positions | None = None,
+                 iterations : int = 200, seed : int = 0) -> Positions:
+    """
+    :param fixed: 已知位置的节点, 布局时保持不动
+    """
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    fixed = fixed or {}
+    rng = numpy.random.default_rng(seed)
+    center = numpy.array([WIDTH / 2, HEIGHT / 2])
+    pos = center + rng.uniform(-1, 1, size=(n, 2)) * [WIDTH / 3, HEIGHT / 3]
+    movable = numpy.ones(n, dtype=bool)
+    for i, node_id in enumerate(node_ids):
+        if node_id in fixed:
+            pos[i] = fixed[node_id]
+            movable[i] = False
+    if not movable.any():
+        return {node_id: tuple(p) for node_id, p in zip(node_ids, pos.tolist())}
+
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    edges = numpy.array([(index[s], index[t]) for s, t in links if s in index and t in index], dtype=int)
+    edges = edges.reshape(-1, 2)
+    k = min(LINK_DISTANCE, math.sqrt(WIDTH * HEIGHT / n))
+
+    for step in range(iterations):
+        temperature = WIDTH / 10 * (1 - step / iterations)  # 线性降温
+        disp = _repulsion(pos, k)
+        if len(edges):
+            delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            dist = numpy.maximum(numpy.linalg.norm(delta, axis=1), 1e-3)
+            pull = delta * (dist / k)[:, None]
+            numpy.add.at(disp, edges[:, 0], -pull)
+            numpy.add.at(disp, edges[:, 1], pull)
+        disp += GRAVITY * (center - pos)
+
+        length = numpy.maximum(numpy.linalg.norm(disp, axis=1), 1e-9)
+        step_len = numpy.minimum(length, temperature)
+        pos[movable] += (disp * (step_len / length)[:, None])[movable]
+
+    # 超出画布时整体缩放到画布内, 保持相对位置; 有固定节点时浏览器中的位置不能变, 只缩放新节点
+    margin = 30
+    low, high = pos[movable].min(axis=0), pos[movable].max(axis=0)
+    box = numpy.array([WIDTH - 2 * margin, HEIGHT - 2 * margin])
+    if (low < margin).any() or (high > [WIDTH - margin, HEIGHT - margin]).any():
+        scale = min(1.0, float((box / numpy.maximum(high - low, 1e-6)).min()))
+        pos[movable] = (pos[movable] - (low + high) / 2) * scale + center
+    return {node_id: tuple(p) for node_id, p in zip(node_ids, pos.tolist())}
+
+
+class LayoutCache(object):
+    """
+    每个图一个json文件: <hash>.json -> {节点id: [x, y]}
+    文件的修改时间记录最近一次使用, 保存时只保留最近用过的 max_entries 个
+    """
+
+    def __init__(self, directory : str = DEFAULT_CACHE, max_entries : int = MAX_CACHED_LAYOUTS):
+        super().__init__()
+        self.directory = directory
+        self.max_entries = max_entries
+        self.loaded : dict[str, Positions] = {}
+        self.dirty : set[str] = set()
+
+    def _path(self, key : str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key : str) -> Positions | None:
+        if key not in self.loaded:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as file:
+                    self.loaded[key] = {node_id: tuple(xy) for node_id, xy in json.load(file).items()}
+                os.utime(self._path(key))  # 标记为最近用过
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取布局缓存失败 {key} : {e}")
+                return None
+        return self.loaded[key]
+
+    def put(self, key : str, positions : Positions):
+        self.loaded[key] = dict(positions)
+        self.dirty.add(key)
+
+    def update(self, key : str, node_id : str, x : float, y : float):
+        positions = self.loaded.get(key)
+        if positions is not None and node_id in positions:
+            positions[node_id] = (x, y)
+            self.dirty.add(key)
+
+    def save(self):
+        """写入改过的布局; 写不进去时(只读目录, 磁盘已满等)只记录日志, 布局仍保存在内存中"""
+        if not self.dirty:
+            return
+        dirty, self.dirty = self.dirty, set()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for key in dirty:
+                tmp_path = self._path(key) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    json.dump(self.loaded[key], file)
+                os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"写入布局缓存失败 {self.directory} : {e}")
+            return
+        self._evict(dirty)
+
+    def _evict(self, keep : set[str]):
+        """删除最久没有用过的布局, 只保留 max_entries 个"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith(".json") and entry.name[:-len(".json")] not in keep]
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+            for entry in entries[max(self.max_entries - len(keep), 0):]:
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"清理布局缓存失败 {self.directory} : {e}")
+
+
+def get_layout(node_ids : list[str], links : list[tuple[str, str]], cache : LayoutCache,
+               fixed : Positions | None = None) -> tuple[str, Positions]:
+    """
+    :return: (图的hash, 布局), 命中缓存时不重新计算; 新的布局只放进cache, 由调用者稍后保存
+    """
+    key = graph_hash(node_ids, links)
+    positions = cache.get(key)
+    if positions is None or any(node_id not in positions for node_id in node_ids):
+        positions = force_layout(node_ids, links, fixed, seed=int(key[:8], 16))
+        cache.put(key, positions)
+        logger.debug(f"计算布局 {len(node_ids)}个节点")
+    return key, positions
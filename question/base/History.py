@@ -0,0 +1,210 @@
+"""
+做题记录
+每次提交追加到 attempts.jsonl (只追加, 批量写入并定期fsync)
+每道题与每个标签的统计保存在 stats.sqlite, 与日志在同一批次中更新, 读取统计时不必重新扫描日志
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_DIR = "history"
+
+
+class Attempt(NamedTuple):
+    question_id: int
+    timestamp: float
+    answer: str
+    correct: bool
+    time_spent: float  # 秒
+    tags: tuple[str, ...] = ()
+
+
+class Stats(NamedTuple):
+    attempts: int
+    correct: int
+    total_time: float
+
+    @property
+    def accuracy(self) -> float:
+        return self.correct / self.attempts if self.attempts else 0.0
+
+
+class AnswerHistory(object):
+    """
+    :param batch_size: 缓存的记录达到这个数量时写入
+    :param flush_interval: 距离上次写入超过这个秒数时, 下一次记录或flush_if_due会写入
+    """
+
+    def __init__(self, directory : str = DEFAULT_DIR, batch_size : int = 20, flush_interval : float = 5.0):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, "attempts.jsonl")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending : list[Attempt] = []
+        self.last_flush = time.monotonic()
+
+        self._repair_log()
+        self.log = open(self.log_path, "ab")
+        self.db = sqlite3.connect(os.path.join(directory, "stats.sqlite"))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS question_stats (
+                question_id INTEGER PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                total_time REAL NOT NULL,
+                last_timestamp REAL,
+                last_correct INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS tag_stats (
+                tag TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                correct INTEGER NOT NULL,
+                total_time REAL NOT NULL
+            );
+        """)
+        self._replay()
+
+    def _repair_log(self):
+        """写到一半退出时最后一行不完整, 截掉这一行, 否则之后追加的记录会接在它后面"""
+        try:
+            with open(self.log_path, "rb+") as file:
+                size = file.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                file.seek(size - 1)
+                if file.read(1) == b"\n":
+                    return
+                end = size
+                while end > 0:
+                    start = max(end - 4096, 0)
+                    file.seek(start)
+                    newline = file.read(end - start).rfind(b"\n")
+                    if newline >= 0:
+                        end = start + newline + 1
+                        break
+                    end = start
+                logger.error(f"日志最后一行不完整, 截掉{size - end}字节")
+                file.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def _log_offset(self) -> int:
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'log_offset'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _replay(self):
+        """统计只记到日志的某个偏移, 程序在两者之间退出时, 把日志多出的部分补进统计"""
+        offset = self._log_offset()
+        size = os.path.getsize(self.log_path)
+        if size <= offset:
+            return
+        attempts = []
+        with open(self.log_path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    attempts.append(Attempt(*json.loads(line)))
+                except (ValueError, TypeError) as e:
+                    logger.error(f"跳过损坏的做题记录 : {e}")
+        logger.debug(f"从日志补充{len(attempts)}条统计")
+        self._update_stats(attempts, size)
+
+    def _update_stats(self, attempts : list[Attempt], log_offset : int):
+        with self.db:
+            for a in attempts:
+                self.db.execute("""
+                    INSERT INTO question_stats VALUES (?, 1, ?, ?, ?, ?)
+                    ON CONFLICT(question_id) DO UPDATE SET
+                        attempts = attempts + 1,
+                        correct = correct + excluded.correct,
+                        total_time = total_time + excluded.total_time,
+                        last_timestamp = excluded.last_timestamp,
+                        last_correct = excluded.last_correct
+                """, (a.question_id, int(a.correct), a.time_spent, a.timestamp, int(a.correct)))
+                for tag in a.tags:
+                    self.db.execute("""
+                        INSERT INTO tag_stats VALUES (?, 1, ?, ?)
+                        ON CONFLICT(tag) DO UPDATE SET
+                            attempts = attempts + 1,
+                            correct = correct + excluded.correct,
+                            total_time = total_time + excluded.total_time
+                    """, (tag, int(a.correct), a.time_spent))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('log_offset', ?)", (str(log_offset),))
+
+    def record(self, question_id : int, answer : str, correct : bool, time_spent : float, tags=()):
+        self.pending.append(Attempt(int(question_id), time.time(), str(answer), bool(correct),
+                                    float(time_spent), tuple(tags)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        if self.pending and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """先写日志并fsync, 再在一个事务中更新统计"""
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        attempts, self.pending = self.pending, []
+        self.log.write(b"".join(json.dumps(a, ensure_ascii=False).encode("utf-8") + b"\n" for a in attempts))
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self._update_stats(attempts, self.log.tell())
+
+    def question_stats(self, question_id : int) -> Stats:
+        row = self.db.execute("SELECT attempts, correct, total_time FROM question_stats WHERE question_id = ?",
+                              (int(question_id),)).fetchone()
+        return Stats(*row) if row else Stats(0, 0, 0.0)
+
+    def tag_stats(self, tag : str) -> Stats:
+        row = self.db.execute("SELECT attempts, correct, total_time FROM tag_stats WHERE tag = ?", (tag,)).fetchone()
+        return Stats(*row) if row else Stats(0, 0, 0.0)
+
+    def all_tag_stats(self) -> dict[str, Stats]:
+        return {tag: Stats(*row) for tag, *row in self.db.execute("SELECT tag, attempts, correct, total_time FROM tag_stats")}
+
+    def solved_ids(self) -> set[int]:
+        return {row[0] for row in self.db.execute("SELECT question_id FROM question_stats WHERE correct > 0")}
+
+    def apply_solved(self, lib):
+        """把答对过的题目标记到题库的答对情况上"""
+        for question_id in self.solved_ids():
+            if question_id in lib:
+                lib[question_id] = True
+
+    def close(self):
+        self.flush()
+        self.log.close()
+        self.db.close()
+
+
+_histories : dict[str, AnswerHistory] = {}
+
+
+def get_history(directory : str = DEFAULT_DIR) -> AnswerHistory:
+    key = os.path.abspath(directory)
+    if key not in _histories:
+        _histories[key] = AnswerHistory(key)
+    return _histories[key]
+
+
+@atexit.register
+def _close_all():
+    for history in _histories.values():
+        try:
+            history.close()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"保存做题记录失败 : {e}")
@@ -0,0 +1,244 @@
+"""
+题目的预渲染: Markdown+LaTeX -> 带MathML的HTML, 显示时不需要再由MathJax排版
+结果按内容hash缓存在磁盘上, 可以用多进程为整个题库预先生成:
+    python -m question.base.MathRender 题型预测/question.json
+没有安装 latex2mathml 时只转换Markdown, 公式留给页面中的MathJax
+"""
+import hashlib
+import html
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import markdown
+
+try:
+    import latex2mathml.converter
+except ImportError:
+    latex2mathml = None
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+RENDER_VERSION = "1"  # 渲染方式改变时修改, 使旧的缓存失效
+DEFAULT_CACHE = os.path.join("cache", "render")
+MEMORY_LIMIT = 8 * 1024 * 1024  # 内存中缓存的渲染结果的字节数上限
+BACKEND = "mathml" if latex2mathml is not None else "markdown"
+
+_MATH = re.compile(r'<(span|div) class="arithmatex">(.*?)</\1>', re.S)
+_DELIMITERS = {"\\(": "\\)", "\\[": "\\]"}
+
+
+_converters : list[markdown.Markdown] = []  # 可复用的转换器, 创建一个需要加载扩展, 开销比转换本身大
+_converters_lock = threading.Lock()
+
+
+def _new_converter() -> markdown.Markdown:
+    return markdown.Markdown(
+        extensions=['pymdownx.arithmatex'],
+        extension_configs={
+            'pymdownx.arithmatex': {
+                'generic': True  # 使用通用TeX格式（\(...\)和\[...\]）
+            }
+        }
+    )
+
+
+def markdown_to_html(md_text : str) -> str:
+    """公式保留为 arithmatex 的 \\(...\\) / \\[...\\] 形式"""
+    with _converters_lock:
+        converter = _converters.pop() if _converters else None
+    if converter is None:
+        converter = _new_converter()
+    try:
+        return converter.convert(md_text)
+    finally:
+        converter.reset()
+        with _converters_lock:
+            _converters.append(converter)
+
+
+def _to_mathml(match : re.Match) -> str:
+    tex = html.unescape(match.group(2)).strip()
+    if tex[:2] in _DELIMITERS and tex.endswith(_DELIMITERS[tex[:2]]):
+        tex = tex[2:-2]
+    try:
+        return latex2mathml.converter.convert(tex, display="block" if match.group(1) == "div" else "inline")
+    except Exception as e:  # latex2mathml 对不支持的命令会抛出各种异常, 这个公式留给MathJax
+        logger.debug(f"无法转换为MathML, 保留原公式 {tex!r} : {e!r}")
+        return match.group(0)
+
+
+def render(md_text : str) -> str:
+    html_text = markdown_to_html(md_text)
+    if latex2mathml is not None:
+        html_text = _MATH.sub(_to_mathml, html_text)
+    return html_text
+
+
+def needs_typeset(html_text : str) -> bool:
+    """还有没转换的公式时需要MathJax排版"""
+    return 'class="arithmatex"' in html_text
+
+
+def cache_key(md_text : str) -> str:
+    return hashlib.sha1(f"{RENDER_VERSION}\0{BACKEND}\0{md_text}".encode("utf-8")).hexdigest()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    hit_time: float  # 秒, 总计
+    miss_time: float
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self):
+        hit_ms = self.hit_time / self.hits * 1000 if self.hits else 0.0
+        miss_ms = self.miss_time / self.misses * 1000 if self.misses else 0.0
+        return f"命中率{self.hit_rate:.0%} ({self.hits}/{self.hits + self.misses}), 命中{hit_ms:.2f}ms, 未命中{miss_ms:.2f}ms"
+
+
+class FragmentCache(object):
+    """按字节数限制大小的LRU, 内容hash -> 渲染结果"""
+
+    def __init__(self, max_bytes : int = MEMORY_LIMIT):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items : OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key : str) -> str | None:
+        html_text = self.items.get(key)
+        if html_text is not None:
+            self.items.move_to_end(key)
+        return html_text
+
+    def put(self, key : str, html_text : str):
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.size -= sys.getsizeof(old)
+        self.items[key] = html_text
+        self.size += sys.getsizeof(html_text)
+        while self.size > self.max_bytes and len(self.items) > 1:
+            _, evicted = self.items.popitem(last=False)
+            self.size -= sys.getsizeof(evicted)
+
+
+class RenderCache(object):
+    """
+    两级缓存: 内存中的LRU, 磁盘上每个结果一个文件: <目录>/<hash前两位>/<hash>.html
+    内容相同的文本只渲染一次, 不同的题库之间也可以共用
+    命中指内存中已有, 从磁盘读取或重新渲染都算未命中
+    """
+
+    def __init__(self, directory : str = DEFAULT_CACHE, max_bytes : int = MEMORY_LIMIT):
+        super().__init__()
+        self.directory = directory
+        self.memory = FragmentCache(max_bytes)
+        self.hits = self.misses = 0
+        self.hit_time = self.miss_time = 0.0
+
+    def _path(self, key : str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+    def get(self, key : str) -> str | None:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"读取渲染缓存失败 {key} : {e}")
+            return None
+
+    def put(self, key : str, html_text : str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # 多个进程可能同时写同一个结果
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(html_text)
+        os.replace(tmp_path, path)
+
+    def render(self, md_text : str) -> str:
+        start = time.perf_counter()
+        key = cache_key(md_text)
+        html_text = self.memory.get(key)
+        if html_text is not None:
+            self.hits += 1
+            self.hit_time += time.perf_counter() - start
+            return html_text
+
+        html_text = self.get(key)
+        if html_text is None:
+            html_text = render(md_text)
+            try:
+                self.put(key, html_text)
+            except OSError as e:
+                logger.warning(f"写入渲染缓存失败 {key} : {e}")
+        self.memory.put(key, html_text)
+        self.misses += 1
+        self.miss_time += time.perf_counter() - start
+        return html_text
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.hit_time, self.miss_time)
+
+
+def question_markdown(question) -> str:
+    """题目页面显示的内容: 题面与选项"""
+    return (question.surface or "") + "\n\n" + " \n\n ".join(question.options or ())
+
+
+def question_texts(question) -> list[str]:
+    texts = [question_markdown(question)]
+    if isinstance(question.analysis, str) and question.analysis:
+        texts.append(question.analysis)
+    return texts
+
+
+def _render_batch(directory : str, texts : list[str]) -> int:
+    cache = RenderCache(directory)
+    for md_text in texts:
+        cache.put(cache_key(md_text), render(md_text))
+    return len(texts)
+
+
+def warm_cache(texts, directory : str = DEFAULT_CACHE, workers : int | None = None, batch_size : int = 64) -> int:
+    """
+    多进程渲染缓存中还没有的文本
+    :return: 新渲染的数量
+    """
+    cache = RenderCache(directory)
+    missing = list({cache_key(t): t for t in texts if cache.get(cache_key(t)) is None}.values())
+    if not missing:
+        return 0
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        done = sum(pool.map(_render_batch, [directory] * len(batches), batches))
+    logger.debug(f"预渲染{done}段文本")
+    return done
+
+
+def warm_library(lib, directory : str = DEFAULT_CACHE, workers : int | None = None) -> int:
+    return warm_cache([text for q in lib.questions() for text in question_texts(q)], directory, workers)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后的程序中, 子进程(沙箱/预渲染)不重新启动界面
+    from question.base import Questions
+
+    manager = Questions.QuestionsManager()
+    manager.load_lib(sys.argv[1] if len(sys.argv) > 1 else r"题型预测/question.json")
+    print(f"新渲染{warm_library(manager)}段文本")
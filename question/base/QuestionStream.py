@@ -0,0 +1,116 @@
+"""
+流式读取题库文件, 一次只在内存中保留一条记录
+支持 json 数组 ([{...}, {...}]) 与 json lines (每行一个{...}, 也允许多行的对象连续排列)
+"""
+import json
+import logging
+import os
+import re
+from typing import BinaryIO, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+Progress = Callable[[int, int, int], None]
+#                  已读字节, 总字节, 已读记录数
+
+# json的结构字符都是ascii, utf-8的多字节字符中不会出现这些字节, 可以直接按字节扫描
+_OUTSIDE_STRING = re.compile(rb'[{}\[\]"]')
+_INSIDE_STRING = re.compile(rb'["\\]')
+_BLANK = b' \t\r\n'
+_BOM = b'\xef\xbb\xbf'
+
+
+def iter_raw_records(file : BinaryIO, chunk_size : int = 1 << 16,
+                     on_chunk : Callable[[], None] | None = None) -> Iterator[tuple[int, bytes]]:
+    """
+    按括号深度切分出每一条顶层对象的原始字节, 不做解析
+    :return: (记录在文件中的起始偏移, 记录字节)
+    """
+    level : int | None = None  # 记录所在的深度, 数组为1, json lines为0
+    depth = 0
+    in_string = False
+    escape = False
+    record = bytearray()
+    record_offset = 0
+    offset = 0  # 当前块在文件中的偏移
+
+    while chunk := file.read(chunk_size):
+        if level is None:
+            head = chunk.lstrip(_BLANK + _BOM)  # BOM可能被分在两块中, 按字节去掉
+            if head:
+                level = 1 if head.startswith(b'[') else 0
+
+        start = 0 if record else None  # 当前记录在本块中的起点
+        pos, n = 0, len(chunk)
+        while pos < n:
+            if in_string:
+                if escape:
+                    escape = False
+                    pos += 1
+                    continue
+                m = _INSIDE_STRING.search(chunk, pos)
+                if m is None:
+                    break
+                pos = m.end()
+                if chunk[m.start()] == 0x5c:  # 反斜杠
+                    escape = True
+                else:
+                    in_string = False
+                continue
+
+            m = _OUTSIDE_STRING.search(chunk, pos)
+            if m is None:
+                break
+            c, pos = chunk[m.start()], m.end()
+            if c == 0x22:  # "
+                in_string = True
+            elif c == 0x7b or c == 0x5b:  # { [
+                if depth == level and c == 0x7b:
+                    start = m.start()
+                    record_offset = offset + start
+                depth += 1
+            else:  # } ]
+                depth = max(depth - 1, 0)
+                if depth == level and start is not None:
+                    record += chunk[start:pos]
+                    yield record_offset, bytes(record)
+                    record.clear()
+                    start = None
+
+        if start is not None:
+            record += chunk[start:]
+        offset += n
+        if on_chunk is not None:
+            on_chunk()
+
+    if record:
+        logger.error(f"文件在偏移{record_offset}处的记录未结束, 已丢弃")
+
+
+def iter_records(path : str, progress : Progress | None = None,
+                 chunk_size : int = 1 << 16) -> Iterator[dict]:
+    """
+    逐条读取题库中的记录, 无法解析的记录会被记录日志并跳过
+    """
+    total = os.path.getsize(path)
+    count = 0
+    skipped = 0
+    with open(path, "rb") as file:
+        report = None
+        if progress is not None:
+            report = lambda: progress(file.tell(), total, count)
+
+        for offset, raw in iter_raw_records(file, chunk_size, report):
+            try:
+                record = json.loads(raw.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                skipped += 1
+                logger.error(f"跳过无法解析的记录 偏移{offset} : {e}")
+                continue
+            count += 1
+            yield record
+
+    if skipped:
+        logger.warning(f"{path} 共跳过{skipped}条记录")
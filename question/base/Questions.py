@@ -1,24 +1,92 @@
+import hashlib
 import json
 import logging
 import os
+import sqlite3
+import sys
+from array import array
+from collections.abc import MutableMapping
+from enum import IntEnum
 from functools import singledispatchmethod
+from typing import Callable
+from question.base import QuestionStream, Snapshot
 logger = logging.getLogger(__name__)
 logging.basicConfig(format='%(levelname)s:%(message)s')
 logger.setLevel(logging.DEBUG)
 
 
+class Difficulty(IntEnum):
+    """题目难度, 数值越小越简单, 可直接用于排序"""
+    EASY = 1
+    MEDIUM = 2
+    HARD = 3
+    EMPTY = 4
+
+    @property
+    def label(self) -> str:
+        return _DIFFICULTY_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label : "str | Difficulty") -> "Difficulty":
+        if isinstance(label, Difficulty):
+            return label
+        for difficulty, name in _DIFFICULTY_LABELS.items():
+            if name == label:
+                return difficulty
+        logger.warning(f"未知的难度 {label}")
+        return cls.EMPTY
+
+    def __str__(self):
+        return self.label
+
+
+_DIFFICULTY_LABELS = {Difficulty.EASY: "简单", Difficulty.MEDIUM: "中等", Difficulty.HARD: "困难", Difficulty.EMPTY: "空"}
+
+
+def intern_tags(tags) -> tuple[str, ...]:
+    """标签在题库中大量重复, 驻留后所有题目共享同一个字符串对象"""
+    return tuple(sys.intern(tag) for tag in tags)
+
+
+FieldLoader = Callable[[int], tuple[str, object, object, tuple[str, ...]]]
+#                      id -> (题面, 答案, 解析, 选项)
+
+
+def _lazy_field(name : str):
+    """题面/答案/解析/选项在第一次访问时才从快照读取, 之后缓存在对象上"""
+    slot = "_" + name
+
+    def getter(self):
+        if self._loader is not None:
+            self.load_fields()
+        return getattr(self, slot)
+
+    def setter(self, value):
+        if self._loader is not None:
+            self.load_fields()
+        setattr(self, slot, value)
+        if name == "surface":
+            self._brief = None
+
+    return property(getter, setter)
+
+
 class Question(object):
     """
     储存一道题目的数据
     """
-    surface: str | None
+    __slots__ = ("_surface", "_answer", "_analysis", "_options", "tags", "_difficulty", "question_id",
+                 "_brief", "_loader", "__weakref__")
+
     solution: str | None
-    analysis: str | None
-    options: list[str]
-    tags: list[str]
-    difficulty: str
+    tags: tuple[str, ...]
     question_id: int
 
+    surface = _lazy_field("surface")
+    answer = _lazy_field("answer")
+    analysis = _lazy_field("analysis")
+    options = _lazy_field("options")
+
     def __init__(self, surface: str = "", answer: str | None = None, analysis: str | None = None):
         super().__init__()
         """
@@ -26,16 +94,54 @@ class Question(object):
         :param answer: 题目答案
         :param analysis: 题目解析
         """
+        self._loader : FieldLoader | None = None
+        self._brief : str | None = None
+
         self.surface = surface
         self.answer = answer
         self.analysis = analysis
 
-        self.options : list[str] = []
-        self.tags : list[str] = []
-        self.difficulty : str = "空"
+        self.options : tuple[str, ...] = ()
+        self.tags : tuple[str, ...] = ()
+        self.difficulty = Difficulty.EMPTY
 
         self.question_id : int = -1
 
+    @property
+    def difficulty(self) -> Difficulty:
+        return self._difficulty
+
+    @difficulty.setter
+    def difficulty(self, value : "str | Difficulty"):
+        self._difficulty = Difficulty.from_label(value)
+
+    @property
+    def brief(self) -> str:
+        """题面开头的几个字, 用于目录等只需要概要的地方, 不会触发懒加载"""
+        if self._brief is not None:
+            return self._brief
+        return self.surface[:Snapshot.BRIEF_LENGTH]
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loader is None
+
+    def load_fields(self):
+        loader, self._loader = self._loader, None
+        if loader is not None:
+            self._surface, self._answer, self._analysis, self._options = loader(self.question_id)
+
+    def loaded_fields(self) -> tuple | None:
+        """已加载时返回 (题面, 答案, 解析, 选项), 否则返回None, 不触发懒加载"""
+        if self._loader is not None:
+            return None
+        return self._surface, self._answer, self._analysis, self._options
+
+    def peek_fields(self) -> tuple:
+        """(题面, 答案, 解析, 选项), 未加载时读取但不缓存在对象上, 遍历题库时使用"""
+        fields = self.loaded_fields()
+        return fields if fields is not None else self._loader(self.question_id)
+
     def unpack(self):
         return self.surface, self.options, self.answer, self.analysis, self.tags
 
@@ -52,21 +158,172 @@ class Question(object):
             raise e
 
         if "options" in d.keys():
-            self.options = d["options"]
+            self.options = tuple(d["options"])
         if "tags" in d.keys():
-            self.tags = d["tags"]
+            self.tags = intern_tags(d["tags"])
         if "difficulty" in d.keys():
             self.difficulty = d["difficulty"]
 
         return self
 
+    def load_from_row(self, row : Snapshot.Row):
+        """从快照的一行加载"""
+        self.question_id, self.surface, answer, analysis, options, tags, self.difficulty = row
+        self.answer = json.loads(answer)
+        self.analysis = json.loads(analysis)
+        self.options = tuple(json.loads(options))
+        self.tags = intern_tags(json.loads(tags))
+        return self
+
+    def load_lazy(self, row : Snapshot.LightRow, loader : FieldLoader):
+        """只加载概要字段, 其余字段第一次访问时由loader读取"""
+        self.question_id, self._brief, tags, self.difficulty = row
+        self.tags = intern_tags(json.loads(tags))
+        self._loader = loader
+        return self
 
-class QuestionsManager(object):
+
+class ColumnarStore(MutableMapping):
+    """
+    按列储存题目, 各字段放在平行的数组中, 访问时才临时生成Question
+    接口与 dict[int, tuple[bool, Question]] 相同, 可直接替换questions_dir
+    懒加载的题目只储存概要, 大字段第一次读取后写回列中
+    """
 
     def __init__(self):
         super().__init__()
-        self.questions_dir : dict[int, tuple[bool, Question]] = {}
+        self.rows : dict[int, int] = {}
+#                       id : 行号
+        self.ids = array("q")
+        self.solved = bytearray()
+        self.difficulty = bytearray()
+        self.surface : list[str | None] = []
+        self.answer : list[str | None] = []
+        self.analysis : list[str | None] = []
+        self.options : list[tuple[str, ...]] = []
+        self.tags : list[tuple[str, ...]] = []
+        self.brief : list[str | None] = []
+        self.loader : list[FieldLoader | None] = []
+#                         未加载的行才有loader
+
+    def _columns(self):
+        return (self.ids, self.solved, self.difficulty, self.surface, self.answer, self.analysis, self.options,
+                self.tags, self.brief, self.loader)
+
+    def _load_row(self, question_id : int):
+        row = self.rows[question_id]
+        loader = self.loader[row]
+        if loader is None:
+            return self.surface[row], self.answer[row], self.analysis[row], self.options[row]
+        fields = loader(question_id)
+        self.surface[row], self.answer[row], self.analysis[row], self.options[row] = fields
+        self.loader[row] = None
+        return fields
+
+    def loaded_fields(self, question_id : int) -> tuple | None:
+        row = self.rows[question_id]
+        if self.loader[row] is not None:
+            return None
+        return self.surface[row], self.answer[row], self.analysis[row], self.options[row]
+
+    def peek_fields(self, question_id : int) -> tuple:
+        """读取但不写回列中"""
+        fields = self.loaded_fields(question_id)
+        return fields if fields is not None else self.loader[self.rows[question_id]](question_id)
+
+    def _make_question(self, row : int) -> Question:
+        q = Question()
+        if self.loader[row] is None:
+            q.surface, q.answer, q.analysis, q.options = \
+                self.surface[row], self.answer[row], self.analysis[row], self.options[row]
+        else:
+            q._brief = self.brief[row]
+            q._loader = self._load_row
+        q.tags = self.tags[row]
+        q.difficulty = Difficulty(self.difficulty[row])
+        q.question_id = self.ids[row]
+        return q
+
+    def __getitem__(self, question_id : int) -> tuple[bool, Question]:
+        row = self.rows[question_id]
+        return bool(self.solved[row]), self._make_question(row)
+
+    def __setitem__(self, question_id : int, value : tuple[bool, Question]):
+        solved, q = value
+        loader = q._loader
+        if loader == self._load_row:
+            # 本store生成的视图写回时沿用原来行的loader
+            loader = self.loader[self.rows[q.question_id]]
+            if loader is None:
+                q.load_fields()
+        if q.is_loaded:
+            fields = (question_id, int(solved), int(q.difficulty), q.surface, q.answer, q.analysis,
+                      tuple(q.options), intern_tags(q.tags), None, None)
+        else:
+            fields = (question_id, int(solved), int(q.difficulty), None, None, None,
+                      (), intern_tags(q.tags), q.brief, loader)
+        row = self.rows.get(question_id)
+        if row is None:
+            self.rows[question_id] = len(self.ids)
+            for column, field in zip(self._columns(), fields):
+                column.append(field)
+        else:
+            for column, field in zip(self._columns(), fields):
+                column[row] = field
+
+    def __delitem__(self, question_id : int):
+        # 用最后一行填补被删除的行, 保持数组紧凑
+        row = self.rows.pop(question_id)
+        last = len(self.ids) - 1
+        if row != last:
+            for column in self._columns():
+                column[row] = column[last]
+            self.rows[self.ids[row]] = row
+        for column in self._columns():
+            del column[last]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self.rows
+
+
+class LibraryListener(object):
+    """
+    题库变化的监听者, 搜索索引等派生数据通过它增量更新
+    library_cleared 表示题库整体清空或替换, 之后派生数据应在下次使用时从题库重新建立,
+    紧接着加入的题目不必逐个处理
+    """
+
+    def question_added(self, question : Question):
+        pass
+
+    def question_removed(self, question : Question):
+        pass
+
+    def library_cleared(self):
+        pass
+
+
+class QuestionsManager(object):
+
+    def __init__(self, columnar : bool = False):
+        """
+        :param columnar: 使用按列储存的ColumnarStore, 内存占用更小, 但每次访问都会生成新的Question对象
+        """
+        super().__init__()
+        self.questions_dir : dict[int, tuple[bool, Question]] | ColumnarStore = ColumnarStore() if columnar else {}
 #                                  id : 答对情况
+        self.tag_index : dict[str, set[int]] = {}
+#                             tag : 含有该标签的题目id
+        self.difficulty_index : dict[Difficulty, set[int]] = {}
+#                                    难度 : 题目id
+        self.reader : Snapshot.Reader | None = None
+        self.listeners : list[LibraryListener] = []
         """
         with open(r".\QuestionLib.json", "r+", encoding="utf-8") as file:
             self.questions_dir = json.load(file)
@@ -91,23 +348,254 @@ class QuestionsManager(object):
     def __contains__(self, question_id : int) -> bool:
         return question_id in self.questions_dir.keys()
 
-    def load_lib(self, path : str):
-        with open(path, "r", encoding="utf-8") as input:
-            input_json = json.load(input)
-            if type(input_json) is not list:
-                logger.error(f"读取类型错误, type = {type(input_json)}, 应为list")
-                try:
-                    input_json = list(input_json)
-                except Exception as e:
-                    logger.error(f"转换失败 error:{e}")
-                    raise TypeError
-
-            for each_question in input_json:
-                q = Question().load_from_json(each_question)
-                self.questions_dir[int(q.question_id)] = (False, q)
+    def __len__(self):
+        return len(self.questions_dir)
+
+    def add_question(self, question : Question, solved : bool = False):
+        """
+        加入一道题目并更新索引, 已存在的同id题目会被替换
+        """
+        question_id = int(question.question_id)
+        if question_id in self.questions_dir:
+            self.remove_question(question_id)
+        self.questions_dir[question_id] = (solved, question)
+        for tag in question.tags:
+            self.tag_index.setdefault(tag, set()).add(question_id)
+        self.difficulty_index.setdefault(question.difficulty, set()).add(question_id)
+        for listener in self.listeners:
+            listener.question_added(question)
+
+    def remove_question(self, question_id : int) -> Question | None:
+        """
+        移除一道题目并更新索引
+        """
+        if question_id not in self.questions_dir:
+            return None
+        _, question = self.questions_dir.pop(question_id)
+        for tag in question.tags:
+            ids = self.tag_index.get(tag)
+            if ids is not None:
+                ids.discard(question_id)
+                if not ids:
+                    del self.tag_index[tag]
+        ids = self.difficulty_index.get(question.difficulty)
+        if ids is not None:
+            ids.discard(question_id)
+            if not ids:
+                del self.difficulty_index[question.difficulty]
+        for listener in self.listeners:
+            listener.question_removed(question)
+        return question
+
+    def clear(self):
+        reader, self.reader = self.reader, None
+        self.questions_dir.clear()
+        self.tag_index.clear()
+        self.difficulty_index.clear()
+        if reader is not None:
+            # 题库中的题目已经释放, 其他地方仍持有的未加载题目读完后关闭连接, 之后快照才能被替换
+            reader.retire()
+        for listener in self.listeners:
+            listener.library_cleared()
+
+    def replace_with(self, other : "QuestionsManager"):
+        """
+        换成另一个题库的内容, 持有本对象的地方同样可见新数据
+        两边都有的题目保留原来的答对情况(包括从做题记录恢复的)
+        """
+        solved = {question_id for question_id, (ok, _) in self.questions_dir.items() if ok}
+        self.clear()
+        self.reader, other.reader = other.reader, None
+        for question_id, (ok, question) in list(other.questions_dir.items()):
+            self.add_question(question, ok or question_id in solved)
+        other.questions_dir.clear()
+
+    def add_listener(self, listener : LibraryListener):
+        self.listeners.append(listener)
+
+    def questions(self):
+        """遍历题库中的所有题目"""
+        for _, question in self.questions_dir.values():
+            yield question
+
+    def loaded_fields(self, question_id : int) -> tuple | None:
+        """已加载的题目的 (题面, 答案, 解析, 选项), 未加载时返回None"""
+        if isinstance(self.questions_dir, ColumnarStore):
+            return self.questions_dir.loaded_fields(question_id)
+        return self.questions_dir[question_id][1].loaded_fields()
+
+    def peek_fields(self, question_id : int) -> tuple:
+        """(题面, 答案, 解析, 选项), 未加载的题目读取后不缓存"""
+        if isinstance(self.questions_dir, ColumnarStore):
+            return self.questions_dir.peek_fields(question_id)
+        return self.questions_dir[question_id][1].peek_fields()
+
+    def iter_fields(self, ids=None):
+        """
+        遍历题目的 (id, 题面, 答案, 解析, 选项), 用于建立索引等需要所有题面的地方
+        已加载的题目直接取字段, 其余的从快照中一次按顺序读出, 都不缓存在题目上
+        :param ids: 只遍历这些题目, 默认为整个题库
+        """
+        pending : set[int] = set()
+        for question_id in list(self.questions_dir.keys()) if ids is None else list(ids):
+            if question_id not in self.questions_dir:
+                continue
+            fields = self.loaded_fields(question_id)
+            if fields is None:
+                pending.add(question_id)
+            else:
+                yield (question_id, *fields)
+        if pending and self.reader is not None:
+            for question_id, surface, answer, analysis, options, _, _ in Snapshot.iter_rows(self.reader.snap_path):
+                if question_id in pending:
+                    pending.discard(question_id)
+                    yield question_id, surface, json.loads(answer), json.loads(analysis), tuple(json.loads(options))
+        for question_id in pending:  # 不在当前快照中的(例如其他题库加入的未加载题目)
+            if question_id in self.questions_dir:
+                yield (question_id, *self.peek_fields(question_id))
+
+    def surface_hashes(self) -> dict[int, str]:
+        """各题题面的hash(Snapshot.content_hash), 未加载的题目使用快照中保存的, 不读取题面"""
+        hashes : dict[int, str] = {}
+        pending : set[int] = set()
+        for question_id in list(self.questions_dir.keys()):
+            fields = self.loaded_fields(question_id)
+            if fields is None:
+                pending.add(question_id)
+            else:
+                hashes[question_id] = Snapshot.content_hash(fields[0] or "")
+        if pending and self.reader is not None:
+            for question_id, surface_hash in Snapshot.iter_hashes(self.reader.snap_path):
+                if question_id in pending:
+                    pending.discard(question_id)
+                    hashes[question_id] = surface_hash
+        for question_id in pending:
+            if question_id in self.questions_dir:
+                hashes[question_id] = Snapshot.content_hash(self.peek_fields(question_id)[0] or "")
+        return hashes
+
+    def all_tags(self) -> list[str]:
+        return list(self.tag_index.keys())
+
+    def ids_by_tag(self, tag : str) -> set[int]:
+        return self.tag_index.get(tag, set())
+
+    def ids_by_difficulty(self, difficulty : str | Difficulty) -> set[int]:
+        return self.difficulty_index.get(Difficulty.from_label(difficulty), set())
+
+    def questions_by_tag(self, tag : str) -> list[Question]:
+        """按id顺序返回含有该标签的题目"""
+        return [self.questions_dir[i][1] for i in sorted(self.ids_by_tag(tag))]
+
+    def related_questions(self, question : Question) -> list[Question]:
+        """
+        与该题目至少有一个相同标签的其他题目, 不重复, 按id排序
+        """
+        ids : set[int] = set()
+        for tag in question.tags:
+            ids |= self.ids_by_tag(tag)
+        ids.discard(question.question_id)
+        return [self.questions_dir[i][1] for i in sorted(ids)]
+
+    def load_lib(self, path : str, use_snapshot : bool = True, progress : QuestionStream.Progress | None = None):
+        """
+        加载题库, 默认使用编译快照, 快照过期或不存在时从json重新生成
+        :param progress: 读取json时的进度回调 (已读字节, 总字节, 已读记录数)
+        """
+        if use_snapshot:
+            snap_path = Snapshot.snapshot_path(path)
+            try:
+                if not Snapshot.is_fresh(path, snap_path):
+                    # 流式写入快照, 不需要把整个json放进内存
+                    Snapshot.build(snap_path, iter_questions(path, progress))
+                # 题面, 解析等大字段在第一次访问时才从快照读取
+                self.reader = Snapshot.Reader(snap_path)
+                for row in Snapshot.iter_light_rows(snap_path):
+                    question = Question().load_lazy(row, self.reader.read_fields)
+                    self.reader.register(question)
+                    self.add_question(question)
+                return self
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"快照不可用, 回退到json : {e}")
+                self.clear()
+        return self.load_json(path, progress)
+
+    def load_json(self, path : str, progress : QuestionStream.Progress | None = None):
+        for q in iter_questions(path, progress):
+            self.add_question(q)
         return self
 
 
+def iter_questions(path : str, progress : QuestionStream.Progress | None = None):
+    """
+    逐条读取json数组或json lines格式的题库, 缺少字段的题目会被跳过
+    """
+    for record in QuestionStream.iter_records(path, progress):
+        try:
+            yield Question().load_from_json(record)
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"跳过格式错误的题目 {str(record)[:50]} : {e!r}")
+
+
+class SharedLib(object):
+    """
+    进程内共享的题库, 所有窗口复用同一个QuestionsManager
+    仅在文件的mtime变化且内容hash也变化时重新读取
+    """
+
+    def __init__(self, path : str):
+        super().__init__()
+        self.path = os.path.abspath(path)
+        self.manager = QuestionsManager()
+        self.stat_key : tuple[int, int] | None = None
+        self.file_hash : str | None = None
+
+    @staticmethod
+    def hash_file(path : str) -> str:
+        h = hashlib.sha1()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def get(self) -> QuestionsManager:
+        st = os.stat(self.path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key == self.stat_key:
+            return self.manager
+
+        file_hash = self.hash_file(self.path)
+        if file_hash != self.file_hash:
+            if self.file_hash is None:
+                logger.debug(f"加载题库 {self.path}")
+                self.manager.load_lib(self.path)
+            else:
+                logger.debug(f"重新加载题库 {self.path}")
+                # 先加载到新的题库, 出错时原来的题库保持不变; 成功后换入, 已打开的窗口持有的引用同样可见新数据
+                try:
+                    fresh = QuestionsManager().load_lib(self.path)
+                except (OSError, ValueError) as e:
+                    fresh = None
+                    logger.error(f"重新加载题库失败, 继续使用原来的题库 : {e!r}")
+                if fresh is not None and len(fresh) == 0 and len(self.manager) > 0:
+                    fresh = None
+                    logger.error(f"题库 {self.path} 中没有读到题目, 继续使用原来的题库")
+                if fresh is not None:
+                    self.manager.replace_with(fresh)
+            self.file_hash = file_hash
+        self.stat_key = stat_key
+        return self.manager
+
+
+_shared_libs : dict[str, SharedLib] = {}
+
+
+def shared_lib(path : str) -> QuestionsManager:
+    """获取共享题库, 第一次调用时才加载"""
+    key = os.path.abspath(path)
+    if key not in _shared_libs:
+        _shared_libs[key] = SharedLib(key)
+    return _shared_libs[key].get()
 
 
 example_question = Question().load_from_file(r"C:\Users\xpwan\Desktop\study_project-2024\question\example_question.json")
@@ -0,0 +1,165 @@
+"""
+相关题目推荐, 按加权的标签Jaccard相似度与难度接近程度排序
+每道题的前k个邻居计算一次后缓存, 打开题目时直接查表
+"""
+import heapq
+import logging
+import math
+import threading
+import weakref
+
+from question.base import Questions
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+TAG_WEIGHT = 0.8
+DIFFICULTY_WEIGHT = 0.2
+
+
+def difficulty_similarity(a : Questions.Difficulty, b : Questions.Difficulty) -> float:
+    if a == Questions.Difficulty.EMPTY or b == Questions.Difficulty.EMPTY:
+        return 0.5
+    return 1 - abs(a - b) / (Questions.Difficulty.HARD - Questions.Difficulty.EASY)
+
+
+class RelatedTable(Questions.LibraryListener):
+    """
+    邻居表, 注册为题库的监听者
+    标签权重只与该标签的题目数有关, 所以一道题增删时只需作废与它有相同标签的题目的邻居
+    加载题库后用 start_build 在后台线程中算出整个表, 打开题目时只需查表
+    """
+
+    def __init__(self, lib : Questions.QuestionsManager, top_k : int = 50):
+        super().__init__()
+        self.lib = weakref.proxy(lib)  # 题库持有本监听者, 这里不反过来持有题库
+        self.top_k = top_k
+        self.table : dict[int, tuple[int, ...]] = {}
+#                          id : 按得分排序的邻居id
+        self.version = 0  # 每次作废时加一, 后台计算期间作废过的行不写入
+        self.outdated = False  # 增删题目后其他行的得分可能稍有变化, 下次 start_build 时全部重新计算
+        self.lock = threading.Lock()
+        self.thread : threading.Thread | None = None
+
+    def tag_weight(self, tag : str) -> float:
+        """越少见的标签权重越高"""
+        return 1 / math.log2(1 + max(len(self.lib.ids_by_tag(tag)), 1))
+
+    def _rank(self, question : Questions.Question) -> tuple[int, ...]:
+        weights = {tag: self.tag_weight(tag) for tag in set(question.tags)}
+        own_weight = sum(weights.values())
+        shared : dict[int, float] = {}
+        for tag, weight in weights.items():
+            for question_id in tuple(self.lib.ids_by_tag(tag)):  # 复制一份, 后台计算时题库可能在变
+                shared[question_id] = shared.get(question_id, 0.0) + weight
+        shared.pop(int(question.question_id), None)
+
+        scores = []
+        weight_cache = dict(weights)
+        for question_id, shared_weight in shared.items():
+            entry = self.lib.questions_dir.get(question_id)
+            if entry is None:
+                continue
+            other = entry[1]
+            other_weight = 0.0
+            for tag in set(other.tags):
+                if tag not in weight_cache:
+                    weight_cache[tag] = self.tag_weight(tag)
+                other_weight += weight_cache[tag]
+            jaccard = shared_weight / (own_weight + other_weight - shared_weight)
+            score = TAG_WEIGHT * jaccard + DIFFICULTY_WEIGHT * difficulty_similarity(question.difficulty, other.difficulty)
+            scores.append((score, -question_id))
+        return tuple(-negative_id for _, negative_id in heapq.nlargest(self.top_k, scores))
+
+    def related_ids(self, question : Questions.Question) -> tuple[int, ...]:
+        """
+        题库中的题目查表, 第一次查询时计算; 不在题库中的题目(例如从文件打开)每次重新计算
+        """
+        question_id = int(question.question_id)
+        if question_id not in self.lib:
+            return self._rank(question)
+        if question_id not in self.table:
+            self.table[question_id] = self._rank(question)
+        return self.table[question_id]
+
+    def related(self, question : Questions.Question) -> list[Questions.Question]:
+        return [self.lib[question_id] for question_id in self.related_ids(question)]
+
+    def build(self, refresh : bool = False):
+        """
+        预先计算整个题库的邻居表, 可以在后台线程中调用
+        :param refresh: 已经算过的行也重新计算, 计算期间仍然使用原来的结果
+        """
+        try:
+            while True:
+                start = version = self.version
+                for question_id in list(self.lib.questions_dir.keys()):
+                    if question_id in self.table and not refresh:
+                        continue
+                    entry = self.lib.questions_dir.get(question_id)
+                    if entry is None:
+                        continue
+                    related = self._rank(entry[1])
+                    with self.lock:
+                        if self.version == version:
+                            self.table[question_id] = related
+                        else:  # 计算期间题库变了, 这一行可能已经过期, 查询时再算
+                            self.table.pop(question_id, None)
+                            version = self.version
+                if self.version == start:  # 这一轮中没有作废过, 表是完整的
+                    break
+                refresh = False
+        except ReferenceError:  # 题库已经释放
+            return
+        logger.debug(f"已计算{len(self.table)}道题的相关题目")
+
+    def start_build(self):
+        """在后台线程中计算整个表, 正在计算或已经算完(且没有过期)时不重复"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        if len(self.table) >= len(self.lib) and not self.outdated:
+            return
+        refresh, self.outdated = self.outdated, False
+        self.thread = threading.Thread(target=self.build, args=(refresh,), name="RelatedTable.build", daemon=True)
+        self.thread.start()
+
+    def _invalidate(self, question : Questions.Question):
+        """
+        作废这道题与和它有相同标签的题目的邻居, 查询时重新计算
+        标签的题目数变化时, 其他题目的候选题目中含有该标签的得分也会稍有变化, 排序可能改变,
+        这些行先继续使用, 标记为过期, 由下一次 start_build 在后台重新计算
+        """
+        with self.lock:
+            self.version += 1
+            if not self.table:  # 刚清空的题库逐题加入时不必逐个查找
+                return
+            self.outdated = True
+            self.table.pop(int(question.question_id), None)
+            for tag in question.tags:
+                for question_id in tuple(self.lib.ids_by_tag(tag)):
+                    self.table.pop(question_id, None)
+
+    def question_added(self, question : Questions.Question):
+        self._invalidate(question)
+
+    def question_removed(self, question : Questions.Question):
+        self._invalidate(question)
+
+    def library_cleared(self):
+        with self.lock:
+            self.version += 1
+            self.outdated = False
+            self.table.clear()
+
+
+_tables : "weakref.WeakKeyDictionary[Questions.QuestionsManager, RelatedTable]" = weakref.WeakKeyDictionary()
+
+
+def get_table(lib : Questions.QuestionsManager) -> RelatedTable:
+    table = _tables.get(lib)
+    if table is None:
+        table = RelatedTable(lib)
+        lib.add_listener(table)
+        _tables[lib] = table
+    return table
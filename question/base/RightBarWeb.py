@@ -1,9 +1,14 @@
+import html
+import json
 import logging
+import re
 import sys, os
-from PyQt6.QtCore import QObject, pyqtSlot, Qt, QUrl
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, Qt, QUrl
 from PyQt6.QtWidgets import QApplication, QMainWindow
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebChannel import QWebChannel
+from typing import Callable, Sequence
+from question.base import AppScheme
 
 # 用于通信的QObject子类
 logger = logging.getLogger(__name__)
@@ -11,14 +16,112 @@ logging.basicConfig(format='%(levelname)s:%(message)s')
 logger.setLevel(logging.DEBUG)
 
 
+class Template(object):
+    """
+    模板只切分一次: 静态片段与 [replaced-xxx] 占位符交替出现, 渲染时一次拼接
+    """
+    SLOT = re.compile(r"\[replaced-([\w-]+)\]")
+
+    def __init__(self, text : str):
+        super().__init__()
+        parts = self.SLOT.split(text)
+        self.chunks : list[str] = parts[0::2]
+        self.slots : list[str] = parts[1::2]
+
+    def render(self, values : dict[str, str], raw : frozenset[str] = frozenset()) -> str:
+        """
+        :param values: 占位符名(不含 replaced- 前缀) -> 值
+        :param raw: 已经是HTML的占位符, 其余的值会被转义
+        """
+        out = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            value = values.get(slot, "")
+            out.append(value if slot in raw else html.escape(value))
+            out.append(chunk)
+        return "".join(out)
+
+
+class PagedResults(object):
+    """
+    按页取出的结果列表, 只保存id, 链接和标题在取到这一页时才生成
+    :param describe: 题目id -> (链接, 标题)
+    """
+
+    def __init__(self, ids : Sequence[int], describe : Callable[[int], tuple[str, str]], page_size : int = 10):
+        super().__init__()
+        self.ids = ids
+        self.describe = describe
+        self.page_size = page_size
+
+    @property
+    def total(self) -> int:
+        return len(self.ids)
+
+    def page(self, cursor : int) -> tuple[list[tuple[str, str]], int]:
+        """:return: (这一页的(链接, 标题), 下一页的cursor), 没有下一页时cursor等于total"""
+        cursor = max(0, min(cursor, self.total))
+        end = min(cursor + self.page_size, self.total)
+        return [self.describe(question_id) for question_id in self.ids[cursor:end]], end
+
+
 class Bridge(QObject):
+    """
+    页面加载完成后, 右侧栏的内容通过信号发送给页面, 不再重新加载整个页面
+    sidebarChanged 替换标签与推荐列表的第一页, sidebarPage 发送页面滚动到底部时请求的下一页
+    每次替换列表时 generation 加一, 页面丢弃不属于当前列表的页
+    页面还没加载好时用模板生成完整的页面
+    """
+    sidebarChanged = pyqtSignal(str)
+    sidebarPage = pyqtSignal(str)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.view : QWebEngineView | None = None  # 用于保存WebEngineView的引用
-        self.question_list : dict[int : tuple[str, str]] = {1 : ("1", "1"), 2 : ("2", "2"), 3 : ("3", "3"), 4 : ("4", "4"), 5 : ("5", "5")}
+        self.results = PagedResults([], lambda question_id: (str(question_id), str(question_id)))
+        self.generation = 0
         self.main_question_connect = None
         self.get_tag = None
-        self.base_html = open(r"question\site\rightBar.html", "r", encoding="utf-8").read()
+        self.template = Template(AppScheme.read_text("site/rightBar.html"))
+        self.tags = ""
+        self.page_is_ready = False
+
+    @pyqtSlot()
+    def page_ready(self):
+        """页面的WebChannel初始化完成, 把当前内容发送过去"""
+        self.page_is_ready = True
+        self.update_sidebar()
+
+    def page_unloaded(self):
+        self.page_is_ready = False
+
+    def set_results(self, results : PagedResults):
+        """换成新的列表并发送第一页, 页面据此换到新的 generation"""
+        self.results = results
+        self.generation += 1
+        self.update_sidebar()
+
+    def page_data(self, cursor : int) -> dict:
+        links, next_cursor = self.results.page(cursor)
+        return {"generation": self.generation, "cursor": cursor, "next": next_cursor,
+                "total": self.results.total, "links": links}
+
+    @pyqtSlot(int, int)
+    def request_page(self, generation : int, cursor : int):
+        if generation != self.generation:
+            return  # 列表已经换了, 页面会收到新的第一页
+        self.sidebarPage.emit(json.dumps(self.page_data(cursor), ensure_ascii=False))
+
+    def render_html(self) -> str:
+        links, _ = self.results.page(0)
+        related = "".join(f'<li><a href="{html.escape(href)}" onclick="handleClick(event)">{html.escape(title)}</a></li>'
+                          for href, title in links)
+        return self.template.render({"tags": self.tags, "related": related}, raw=frozenset({"related"}))
+
+    def update_sidebar(self):
+        if self.page_is_ready:
+            self.sidebarChanged.emit(json.dumps(dict(self.page_data(0), tags=self.tags), ensure_ascii=False))
+        elif self.view is not None:
+            self.view.setHtml(self.render_html(), AppScheme.url("site/rightBar.html"))  # 页面中的脚本按这个地址加载
 
     @pyqtSlot(str)
     def handle_tag(self, tag):
@@ -29,27 +132,13 @@ class Bridge(QObject):
         assert self.view is not None
         assert callable(self.main_question_connect)
         assert callable(self.get_tag)
-        tags = []
         try:
-            self.main_question_connect(int(tag))
-            tags = " ".join(self.get_tag(int(tag)))
-        except ValueError as e:
-            self.main_question_connect(tag)
-            tags = " ".join(self.get_tag(tag))
-
-        self.view.setHtml(self.base_html
-                          .replace("[replaced-site1]", self.question_list[1][0])
-                          .replace("[replaced-site2]", self.question_list[2][0])
-                          .replace("[replaced-site3]", self.question_list[3][0])
-                          .replace("[replaced-site4]", self.question_list[4][0])
-                          .replace("[replaced-site5]", self.question_list[5][0])
-                          .replace("[replaced-site1-title]", self.question_list[1][1])
-                          .replace("[replaced-site2-title]", self.question_list[2][1])
-                          .replace("[replaced-site3-title]", self.question_list[3][1])
-                          .replace("[replaced-site4-title]", self.question_list[4][1])
-                          .replace("[replaced-site5-title]", self.question_list[5][1])
-                          .replace("[replaced-tags]", tags)
-                          )
+            key = int(tag)
+        except ValueError:
+            key = tag
+        # 先更新标签, 加载题目时 set_results 连同标签一起发送
+        self.tags = " ".join(self.get_tag(key))
+        self.main_question_connect(key)
 
 
 class MainWindow(QMainWindow):
@@ -63,6 +152,7 @@ class MainWindow(QMainWindow):
         # 创建通信桥接对象
         self.bridge = Bridge()
         self.bridge.view = self.view  # 传递view引用
+        self.view.loadStarted.connect(self.bridge.page_unloaded)
 
         # 设置WebChannel
         self.channel = QWebChannel()
@@ -70,9 +160,8 @@ class MainWindow(QMainWindow):
         self.view.page().setWebChannel(self.channel)
 
         # 初始化HTML内容
-        initial_html = open(r"../site/rightBar.html", "r", encoding="utf-8").read()
-
-        self.view.setHtml(initial_html)
+        AppScheme.install(self.view.page().profile())
+        self.view.setUrl(AppScheme.url("site/rightBar.html"))
         self.setWindowTitle("Tag Navigation Demo")
         self.resize(800, 600)
 
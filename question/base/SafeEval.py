@@ -0,0 +1,327 @@
+"""
+计算器中用户输入的公式的安全求值
+- 语法树中只允许白名单中的节点与名字, 不能访问属性/调用任意函数
+- 乘方, 阶乘等会产生巨大整数的运算先估计结果大小, 超出限制时报错而不是卡住
+- 逐项计算时按运算次数计费, 超出预算时报错
+- 计算放在单独的进程中, 超时或取消后结束该进程, 界面不会被卡住; 生成器函数的每一段结果会依次送回
+出错时抛出 EvalError, 带有错误类型与位置, 界面可以直接显示
+"""
+import ast
+import atexit
+import inspect
+import logging
+import math
+import multiprocessing
+import threading
+import time
+import types
+from fractions import Fraction
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+TIMEOUT = 5.0  # 秒
+MAX_OPERATIONS = 10 ** 8
+MAX_INT_BITS = 1 << 17  # 约4万位十进制数
+MAX_FACTORIAL = 10000
+POLL_INTERVAL = 0.05  # 秒, 等待结果时检查是否取消的间隔
+STARTUP_TIMEOUT = 60.0  # 秒, 启动进程并导入计算用的模块, 不计入计算的时间
+TOTAL_TIMEOUT = 120.0  # 秒, 分段给出结果时整个计算的时间上限
+
+
+class EvalError(ValueError):
+    """
+    :param kind: syntax 语法错误 / forbidden 不允许的写法 / name 未知的名字 / budget 超出计算量限制
+                 timeout 超时 / cancelled 已取消 / runtime 计算出错
+    :param position: 出错位置在公式中的列号(从0开始), 不确定时为None
+    """
+
+    KINDS = {"syntax": "语法错误", "forbidden": "不允许的写法", "name": "未知的名字",
+             "budget": "计算量过大", "timeout": "计算超时", "cancelled": "已取消",
+             "runtime": "计算出错"}
+
+    def __init__(self, kind : str, message : str, position : int | None = None):
+        super().__init__(message)
+        self.kind = kind
+        self.message = message
+        self.position = position
+
+    def __reduce__(self):
+        return EvalError, (self.kind, self.message, self.position)
+
+    def __str__(self):
+        where = f" (第{self.position + 1}个字符)" if self.position is not None else ""
+        return f"{self.KINDS.get(self.kind, self.kind)}: {self.message}{where}"
+
+
+def _bits(value) -> float:
+    """整数或分数(取分子分母中较大的)的位数"""
+    if isinstance(value, Fraction):
+        return max(_bits(value.numerator), _bits(value.denominator))
+    return math.log2(abs(value)) if abs(value) > 1 else 0
+
+
+def safe_pow(base, exponent, modulus=None):
+    if modulus is not None:
+        return pow(base, exponent, modulus)  # 三个参数的pow按模计算, 不会产生大数
+    if isinstance(base, (int, Fraction)) and isinstance(exponent, int):
+        if abs(exponent) * _bits(base) > MAX_INT_BITS:
+            raise EvalError("budget", f"乘方的结果超过{MAX_INT_BITS}位")
+    return base ** exponent
+
+
+def _limited(func, limit : int):
+    def wrapper(*args):
+        if any(isinstance(arg, int) and abs(arg) > limit for arg in args):
+            raise EvalError("budget", f"{func.__name__}的参数不能超过{limit}")
+        return func(*args)
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+MATH_NAMES = {name: value for name, value in vars(math).items() if not name.startswith("_")}
+MATH_NAMES.update(pow=math.pow, factorial=_limited(math.factorial, MAX_FACTORIAL),
+                  comb=_limited(math.comb, MAX_FACTORIAL), perm=_limited(math.perm, MAX_FACTORIAL))
+BUILTINS = {"abs": abs, "min": min, "max": max, "round": round, "pow": safe_pow, "int": int, "float": float}
+
+# 公式中可用的名字, 与原先 eval(expr, {'n': k, 'math': math}, math.__dict__) 可用的一致, 但函数换成了有限制的版本
+SAFE_NAMES = dict(BUILTINS, **MATH_NAMES, math=types.SimpleNamespace(**MATH_NAMES))
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Call,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def _error(kind : str, message : str, node : ast.AST | None = None) -> EvalError:
+    return EvalError(kind, message, getattr(node, "col_offset", None))
+
+
+def parse(expr : str, variables : tuple[str, ...] = ("n",)) -> ast.Expression:
+    """
+    解析并检查公式, variables 中含有 a 时允许 a[...]
+    :raise EvalError: 语法错误, 或使用了不允许的写法/名字
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except SyntaxError as e:
+        raise EvalError("syntax", e.msg, e.offset - 1 if e.offset else None) from e
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript) and "a" in variables:
+            if not (isinstance(node.value, ast.Name) and node.value.id == "a"):
+                raise _error("forbidden", f"只能对 a 取下标: {ast.unparse(node)}", node)
+            continue
+        if not isinstance(node, _ALLOWED_NODES):
+            raise _error("forbidden", type(node).__name__, node)
+        if isinstance(node, ast.Constant) and (not isinstance(node.value, (int, float)) or isinstance(node.value, bool)):
+            raise _error("forbidden", f"只能使用数字: {node.value!r}", node)
+        if isinstance(node, ast.Name) and node.id not in variables and node.id not in SAFE_NAMES:
+            raise _error("name", node.id, node)
+        if isinstance(node, ast.Attribute) and not (
+                isinstance(node.value, ast.Name) and node.value.id == "math" and node.attr in MATH_NAMES):
+            raise _error("forbidden", f"只能使用 math 中的函数: {ast.unparse(node)}", node)
+        if isinstance(node, ast.Call) and node.keywords:
+            raise _error("forbidden", "函数不支持关键字参数", node)
+    return tree
+
+
+class _SafePow(ast.NodeTransformer):
+    """x ** y 改写为 _pow(x, y)"""
+
+    def visit_BinOp(self, node : ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(ast.Call(func=ast.Name(id="_pow", ctx=ast.Load()),
+                                              args=[node.left, node.right], keywords=[]), node)
+        return node
+
+
+def compile_safe(tree : ast.Expression, filename : str = "<公式>"):
+    """编译检查过的语法树, 求值时使用 namespace()"""
+    return compile(ast.fix_missing_locations(_SafePow().visit(tree)), filename, "eval")
+
+
+def namespace(**variables) -> dict:
+    return dict(SAFE_NAMES, _pow=safe_pow, **variables)
+
+
+def cost(tree : ast.Expression) -> int:
+    """求值一次的运算次数, 按节点数估计"""
+    return sum(1 for _ in ast.walk(tree))
+
+
+def check_value(value):
+    """递推时每一项都检查, 防止整数一项比一项大得多"""
+    if isinstance(value, (int, Fraction)) and _bits(value) > MAX_INT_BITS:
+        raise EvalError("budget", f"数值超过{MAX_INT_BITS}位")
+    return value
+
+
+class Budget(object):
+    def __init__(self, limit : int = MAX_OPERATIONS):
+        super().__init__()
+        self.limit = limit
+        self.used = 0
+
+    def charge(self, operations : int):
+        self.used += operations
+        if self.used > self.limit:
+            raise EvalError("budget", f"运算次数超过{self.limit}")
+
+
+def _worker(conn):
+    """
+    工作进程: 依次执行收到的 (函数, 参数), 把结果或错误发回
+    收到后(函数所在的模块已经导入)先发送 ("started", None), 超时从这时开始计算
+    函数返回生成器时, 每一段发送 ("chunk", 值), 最后发送 ("ok", None)
+    """
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        func, args = message
+        conn.send(("started", None))
+        try:
+            result = func(*args)
+            if inspect.isgenerator(result):
+                for chunk in result:
+                    conn.send(("chunk", chunk))
+                result = None
+            conn.send(("ok", result))
+        except EvalError as e:
+            conn.send(("error", e))
+        except Exception as e:
+            conn.send(("error", EvalError("runtime", f"{type(e).__name__}: {e}")))
+
+
+class Sandbox(object):
+    """
+    在单独的进程中计算, 进程在多次调用之间复用, 超时或取消后结束并立即启动新的进程
+    函数与参数需要能被pickle(模块中的顶层函数); 可以在多个线程中使用, 调用依次执行
+    """
+
+    def __init__(self, timeout : float = TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self.context = multiprocessing.get_context("spawn")  # 各个平台行为一致, 不继承Qt的状态
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _start(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def start(self):
+        """提前启动进程, 第一次计算时不用等待进程启动"""
+        if self.process is None or not self.process.is_alive():
+            self._start()
+
+    def restart(self):
+        self.kill()
+        self.start()
+
+    def call(self, func, *args, timeout : float | None = None, on_chunk=None, cancelled=None,
+             total_timeout : float = TOTAL_TIMEOUT):
+        """
+        func 为生成器函数时, 每收到一段结果调用 on_chunk(值), 返回None
+        超时有两个: timeout 为相邻两段结果(或唯一的结果)之间的间隔, total_timeout 为整个计算
+        :param cancelled: 等待时定期调用, 返回True时结束计算
+        :raise EvalError: 计算出错, 超时或被取消
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self.lock:
+            self.start()
+            self.conn.send((func, args))
+            # 刚启动(或取消后重新启动)的进程要先导入模块, 这段时间不算进计算的超时
+            status, value = self._receive(STARTUP_TIMEOUT, cancelled)
+            if status != "started":
+                self.restart()
+                raise EvalError("runtime", f"计算进程没有正常启动: {status}")
+            total_deadline = time.monotonic() + total_timeout
+            while True:
+                status, value = self._receive(timeout, cancelled, total_deadline)
+                if status == "error":
+                    raise value
+                if status == "ok":
+                    return value
+                try:
+                    if on_chunk is not None:
+                        on_chunk(value)
+                except BaseException:
+                    self.restart()  # 剩下的结果不再需要
+                    raise
+
+    def _receive(self, timeout : float, cancelled, total_deadline : float | None = None) -> tuple:
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled is not None and cancelled():
+                self.restart()
+                raise EvalError("cancelled", "计算已取消")
+            if total_deadline is not None and time.monotonic() >= total_deadline:
+                self.restart()
+                raise EvalError("timeout", "整个计算的时间超过上限")
+            remaining = deadline - time.monotonic()
+            if total_deadline is not None:
+                remaining = min(remaining, total_deadline - time.monotonic())
+            if remaining <= 0:
+                self.restart()
+                raise EvalError("timeout", f"超过{timeout}秒没有得到结果")
+            if self.conn.poll(min(remaining, POLL_INTERVAL) if cancelled is not None else remaining):
+                break
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.kill()
+            raise EvalError("runtime", "计算进程意外退出")
+
+    def kill(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(1)
+            except (OSError, BrokenPipeError):
+                pass
+        self.kill()
+
+
+_sandbox : Sandbox | None = None
+
+
+def sandbox() -> Sandbox:
+    """共用的沙箱"""
+    global _sandbox
+    if _sandbox is None:
+        _sandbox = Sandbox()
+    return _sandbox
+
+
+def run(func, *args, timeout : float | None = None, on_chunk=None, cancelled=None,
+        total_timeout : float = TOTAL_TIMEOUT):
+    """在共用的沙箱进程中计算 func(*args), 参数见 Sandbox.call"""
+    return sandbox().call(func, *args, timeout=timeout, on_chunk=on_chunk, cancelled=cancelled,
+                          total_timeout=total_timeout)
+
+
+@atexit.register
+def _close_sandbox():
+    if _sandbox is not None:
+        _sandbox.close()
@@ -0,0 +1,219 @@
+"""
+题库全文搜索, 对题面, 选项与解析建立倒排索引, 使用BM25排序
+中文按字的1-2元组切分, LaTeX按命令名(\\frac)与下标表达式(a_{n+1})切分
+"""
+import logging
+import math
+import re
+import weakref
+from collections import Counter
+
+import numpy
+
+from question.base import Questions
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+_TOKEN = re.compile(
+    r"(?P<command>\\[A-Za-z]+)"                                           # \frac \sum
+    r"|(?P<script>[A-Za-z](?:[_^](?:\{[^{}]*\}|[A-Za-z0-9]))+)"           # a_{n+1} a_n q^{n-1}
+    r"|(?P<cjk>[\u4e00-\u9fff]+)"                                    # 中文
+    r"|(?P<word>[A-Za-z]+|\d+)"
+)
+_SCRIPT_PART = re.compile(r"[_^](?:\{([^{}]*)\}|([A-Za-z0-9]))")
+
+
+def _normalize_script(text : str) -> str:
+    """a_n 与 a_{n} 视为同一个词, 并去掉空格"""
+    text = text.replace(" ", "")
+    return text[0] + _SCRIPT_PART.sub(lambda m: m.group(0)[0] + "{" + (m.group(1) or m.group(2)) + "}", text[1:])
+
+
+def tokenize(text : str) -> list[str]:
+    tokens = []
+    for m in _TOKEN.finditer(text):
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "command":
+            tokens.append(value)
+        elif kind == "script":
+            # 整个下标表达式, 以及其中的字母, 这样搜a_n或者n都能命中
+            tokens.append(_normalize_script(value))
+            tokens.extend(c.lower() for c in re.findall(r"[A-Za-z]+|\d+", value))
+        elif kind == "cjk":
+            tokens.extend(value)
+            tokens.extend(value[i:i + 2] for i in range(len(value) - 1))
+        else:
+            tokens.append(value.lower())
+    return tokens
+
+
+def document_text(surface : str | None, options, analysis) -> str:
+    if isinstance(analysis, list):
+        analysis = "\n".join(map(str, analysis))
+    return "\n".join([surface or "", *options, str(analysis or "")])
+
+
+def question_text(question : Questions.Question) -> str:
+    return document_text(question.surface, question.options, question.analysis)
+
+
+class SearchIndex(Questions.LibraryListener):
+    """
+    倒排索引, 注册为题库的监听者后随题库的增删增量更新
+    倒排表以dict储存方便增删, 查询时转换成numpy数组批量计算得分, 转换结果缓存到该词下次变化为止
+    题面等从快照中批量读取(Questions.QuestionsManager.iter_fields), 不填充懒加载的题目
+    """
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, lib : Questions.QuestionsManager | None = None):
+        super().__init__()
+        self.lib = weakref.proxy(lib) if lib is not None else None
+        self.built = lib is None  # 题库清空或替换后置为False, 下次查询时整体重建
+        self.postings : dict[str, dict[int, int]] = {}
+#                            词 : {行号 : 词频}
+        self.doc_terms : dict[int, tuple[str, ...]] = {}
+#                             行号 : 该题出现过的词, 删除时使用
+        self.rows : dict[int, int] = {}
+#                       题目id : 行号
+        self.row_ids : list[int] = []
+        self.free_rows : list[int] = []
+        self.lengths = numpy.zeros(64, dtype=numpy.float32)
+        self.total_len = 0
+        self._arrays : dict[str, tuple[numpy.ndarray, numpy.ndarray]] = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _new_row(self, question_id : int) -> int:
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.row_ids[row] = question_id
+        else:
+            row = len(self.row_ids)
+            self.row_ids.append(question_id)
+            if row >= len(self.lengths):
+                self.lengths = numpy.concatenate([self.lengths, numpy.zeros_like(self.lengths)])
+        self.rows[question_id] = row
+        return row
+
+    def add_document(self, question_id : int, text : str):
+        if question_id in self.rows:
+            self.remove_document(question_id)
+        row = self._new_row(question_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[row] = tf
+            self._arrays.pop(term, None)
+        self.doc_terms[row] = tuple(counts)
+        length = sum(counts.values())
+        self.lengths[row] = length
+        self.total_len += length
+
+    def remove_document(self, question_id : int):
+        row = self.rows.pop(question_id, None)
+        if row is None:
+            return
+        for term in self.doc_terms.pop(row):
+            docs = self.postings[term]
+            del docs[row]
+            self._arrays.pop(term, None)
+            if not docs:
+                del self.postings[term]
+        self.total_len -= int(self.lengths[row])
+        self.lengths[row] = 0
+        self.free_rows.append(row)
+
+    def _reset(self):
+        self.postings.clear()
+        self.doc_terms.clear()
+        self.rows.clear()
+        self.row_ids = []
+        self.free_rows = []
+        self.lengths = numpy.zeros(64, dtype=numpy.float32)
+        self.total_len = 0
+        self._arrays.clear()
+
+    def build(self):
+        """从题库重新建立"""
+        self._reset()
+        for question_id, surface, _, analysis, options in self.lib.iter_fields():
+            self.add_document(question_id, document_text(surface, options, analysis))
+        self.built = True
+        logger.debug(f"已建立搜索索引, 共{len(self)}题, {len(self.postings)}个词")
+
+    def question_added(self, question : Questions.Question):
+        if not self.built:
+            return
+        question_id = int(question.question_id)
+        if self.lib is not None and question_id in self.lib:
+            surface, _, analysis, options = self.lib.peek_fields(question_id)
+            self.add_document(question_id, document_text(surface, options, analysis))
+        else:
+            self.add_document(question_id, question_text(question))
+
+    def question_removed(self, question : Questions.Question):
+        if self.built:
+            self.remove_document(int(question.question_id))
+
+    def library_cleared(self):
+        self._reset()
+        self.built = self.lib is None
+
+    def _term_arrays(self, term : str) -> tuple[numpy.ndarray, numpy.ndarray] | None:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            docs = self.postings.get(term)
+            if not docs:
+                return None
+            arrays = (numpy.fromiter(docs.keys(), dtype=numpy.int64, count=len(docs)),
+                      numpy.fromiter(docs.values(), dtype=numpy.float32, count=len(docs)))
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(self, query : str, limit : int = 20) -> list[tuple[int, float]]:
+        """
+        :return: [(题目id, 得分)], 按得分从高到低
+        """
+        if not self.built:
+            self.build()
+        n = len(self.rows)
+        if n == 0:
+            return []
+        k1, b = self.k1, self.b
+        norm = k1 * (1 - b + b * self.lengths / (self.total_len / n))
+        scores = numpy.zeros(len(self.lengths), dtype=numpy.float32)
+        for term in set(tokenize(query)):
+            arrays = self._term_arrays(term)
+            if arrays is None:
+                continue
+            rows, tf = arrays
+            idf = math.log(1 + (n - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * tf * (k1 + 1) / (tf + norm[rows])
+
+        hits = numpy.flatnonzero(scores)
+        if len(hits) > limit:
+            hits = hits[numpy.argpartition(scores[hits], -limit)[-limit:]]
+        hits = hits[numpy.argsort(-scores[hits], kind="stable")]
+        return [(self.row_ids[row], float(scores[row])) for row in hits]
+
+
+_indexes : "weakref.WeakKeyDictionary[Questions.QuestionsManager, SearchIndex]" = weakref.WeakKeyDictionary()
+
+
+def get_index(lib : Questions.QuestionsManager) -> SearchIndex:
+    """题库对应的搜索索引, 第一次调用时建立, 之后随题库增量更新"""
+    index = _indexes.get(lib)
+    if index is None:
+        index = SearchIndex(lib)
+        index.build()
+        lib.add_listener(index)
+        _indexes[lib] = index
+    return index
+
+
+def search(lib : Questions.QuestionsManager, query : str, limit : int = 20) -> list[Questions.Question]:
+    return [lib[question_id] for question_id, _ in get_index(lib).search(query, limit)]
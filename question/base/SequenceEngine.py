@@ -0,0 +1,801 @@
+"""
+数列计算器的计算部分
+通项公式只解析一次: 先检查语法树中只有允许的节点, 再编译为对 numpy.arange(n) 整体计算的函数
+不能整体计算的写法(例如 factorial)退回逐项计算, 但仍然只编译一次
+递推式同样只编译一次; 常系数线性递推 a[n] = c1*a[n-1] + ... + ck*a[n-k] + d 识别出来后
+用 scipy.signal.lfilter (没有安装scipy时用不经过eval的循环) 计算, 单独的很远的一项用矩阵快速幂计算
+公式的检查与逐项求值的限制见 SafeEval, compute_values/iter_values/compute_term 可以放进 SafeEval 的沙箱进程中执行
+iter_values 分段给出结果, 很长的数列可以边算边显示
+数值类型可选 float64 / 精确的整数与分数 / 指定精度的 decimal; 编译后的公式按 (公式, 初始项, 数值类型) 缓存,
+已经算出的项保存在其中, 项数增加时只计算新增的部分
+"""
+import ast
+import contextlib
+import decimal
+import functools
+import logging
+import math
+import operator
+import re
+import time
+import types
+from fractions import Fraction
+
+import numpy
+
+from question.base import SafeEval
+
+try:
+    from scipy.signal import lfilter, lfiltic
+except ImportError:
+    lfilter = lfiltic = None
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+
+RECURRENCE = 1  # 与计算器设置中的模式编号一致
+CLOSED_FORM = 2
+VECTOR_CHUNK = 1 << 20  # 整体计算时每段的项数
+PROGRESS_INTERVAL = 0.2  # 秒, 逐项计算时每隔这么久给出一段结果
+CACHE_SIZE = 16  # 缓存的公式数, 每个公式带着已经算出的项
+DEFAULT_PRECISION = 50  # decimal 的有效数字位数
+
+# 可以整体计算的函数: 公式中的名字 -> numpy中的函数
+NUMPY_FUNCS = {
+    "sin": numpy.sin, "cos": numpy.cos, "tan": numpy.tan,
+    "asin": numpy.arcsin, "acos": numpy.arccos, "atan": numpy.arctan, "atan2": numpy.arctan2,
+    "sinh": numpy.sinh, "cosh": numpy.cosh, "tanh": numpy.tanh,
+    "exp": numpy.exp, "expm1": numpy.expm1, "log2": numpy.log2, "log10": numpy.log10, "log1p": numpy.log1p,
+    "sqrt": numpy.sqrt, "fabs": numpy.abs, "abs": numpy.abs,
+    "floor": numpy.floor, "ceil": numpy.ceil, "trunc": numpy.trunc, "int": numpy.trunc, "float": numpy.asarray,
+    "pow": numpy.power, "hypot": numpy.hypot, "copysign": numpy.copysign,
+    "degrees": numpy.degrees, "radians": numpy.radians,
+    "min": numpy.minimum, "max": numpy.maximum, "round": numpy.round,
+}
+
+_VECTOR_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_VECTOR_COMPARES = {ast.Lt: numpy.less, ast.LtE: numpy.less_equal, ast.Gt: numpy.greater,
+                    ast.GtE: numpy.greater_equal, ast.Eq: numpy.equal, ast.NotEq: numpy.not_equal}
+
+
+def _to_float(value) -> float:
+    """
+    画图用的float64; 超出float范围, 除以0等得到的无穷大一律为nan,
+    逐项计算与整体计算(numpy不抛出异常, 直接得到inf)的结果一致
+    """
+    try:
+        value = float(value)
+    except (OverflowError, TypeError, ValueError):  # 超出float范围的整数, 复数等
+        return math.nan
+    return value if math.isfinite(value) else math.nan
+
+
+def _finite(values : numpy.ndarray) -> numpy.ndarray:
+    """整体计算的结果按 _to_float 的规则处理"""
+    values[~numpy.isfinite(values)] = math.nan
+    return values
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+class _Vectorizer(ast.NodeTransformer):
+    """把公式改写为对数组计算: math函数换成numpy函数, 条件表达式换成 numpy.where"""
+
+    def generic_visit(self, node):
+        if not isinstance(node, (ast.Expression, ast.Constant, ast.BinOp, ast.UnaryOp, ast.Load,
+                                 ast.operator, ast.unaryop)):
+            raise _NotVectorizable(type(node).__name__)
+        if isinstance(node, ast.BinOp) and not isinstance(node.op, _VECTOR_BINOPS):
+            raise _NotVectorizable(type(node.op).__name__)
+        return super().generic_visit(node)
+
+    @staticmethod
+    def _func(name : str) -> ast.expr:
+        return ast.Attribute(value=ast.Name(id="_funcs", ctx=ast.Load()), attr=name, ctx=ast.Load())
+
+    def visit_Name(self, node : ast.Name):
+        if node.id in SafeEval.MATH_NAMES and isinstance(SafeEval.MATH_NAMES[node.id], float):
+            return ast.Constant(SafeEval.MATH_NAMES[node.id])
+        if node.id == "n":
+            return node
+        raise _NotVectorizable(node.id)
+
+    def visit_Attribute(self, node : ast.Attribute):
+        # 检查时已经保证是 math.xxx
+        return self.visit_Name(ast.Name(id=node.attr, ctx=ast.Load()))
+
+    def visit_Call(self, node : ast.Call):
+        name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+        if name == "log" and len(node.args) in (1, 2):
+            args = [self.visit(arg) for arg in node.args]
+            call = ast.Call(func=self._func("log"), args=[args[0]], keywords=[])
+            if len(args) == 1:
+                return call
+            return ast.BinOp(left=call, op=ast.Div(),
+                             right=ast.Call(func=self._func("log"), args=[args[1]], keywords=[]))
+        if name not in NUMPY_FUNCS or (name == "round" and len(node.args) != 1):
+            raise _NotVectorizable(str(name))
+        return ast.Call(func=self._func(name), args=[self.visit(arg) for arg in node.args], keywords=[])
+
+    def visit_IfExp(self, node : ast.IfExp):
+        return ast.Call(func=self._func("where"),
+                        args=[self.visit(node.test), self.visit(node.body), self.visit(node.orelse)],
+                        keywords=[])
+
+    def visit_Compare(self, node : ast.Compare):
+        if len(node.ops) != 1 or type(node.ops[0]) not in _VECTOR_COMPARES:
+            raise _NotVectorizable("Compare")
+        return ast.Call(func=self._func(_VECTOR_COMPARES[type(node.ops[0])].__name__),
+                        args=[self.visit(node.left), self.visit(node.comparators[0])], keywords=[])
+
+
+class _Funcs(object):
+    """numpy.where 等与公式中的函数名一起放在一个命名空间里"""
+
+    def __init__(self):
+        for name, func in NUMPY_FUNCS.items():
+            setattr(self, name, func)
+        self.log = numpy.log
+        self.where = numpy.where
+        for func in _VECTOR_COMPARES.values():
+            setattr(self, func.__name__, func)
+
+
+_FUNCS = _Funcs()
+
+
+class Numbers(object):
+    """
+    float64: 初始项与公式中的小数都是float, 能整体计算的用numpy整体计算
+    各种数值类型的区别只在于初始项与公式中的小数怎样表示, 以及整数相除的结果
+    """
+
+    name = "float"
+
+    def __init__(self, precision : int | None = None):
+        super().__init__()
+        self.precision = precision
+
+    def number(self, value):
+        """初始项(文本, 可以写成分数)或公式中的小数"""
+        return float(Fraction(value)) if isinstance(value, str) else float(value)
+
+    def div(self, x, y):
+        return x / y
+
+    def constant(self, name : str):
+        """math中的常数(pi, e, tau, inf, nan)"""
+        return self.number(SafeEval.MATH_NAMES[name])
+
+    def names(self) -> dict:
+        """公式中需要换掉的名字"""
+        return {}
+
+    def context(self):
+        return contextlib.nullcontext()
+
+
+class ExactNumbers(Numbers):
+    """整数与分数精确计算; sqrt 等函数的结果仍然是float"""
+
+    name = "exact"
+
+    def number(self, value):
+        if isinstance(value, float):
+            if not math.isfinite(value):  # inf, nan 没有对应的分数
+                return value
+            value = repr(value)  # 0.1 -> 1/10 而不是float的二进制值
+        return _normalize(Fraction(value))
+
+    def div(self, x, y):
+        if isinstance(x, (int, Fraction)) and isinstance(y, (int, Fraction)):
+            return _normalize(Fraction(x) / Fraction(y))
+        return x / y
+
+
+class DecimalNumbers(Numbers):
+    """十进制小数, 有效数字为 precision 位"""
+
+    name = "decimal"
+    FUNCS = {"sqrt": "sqrt", "exp": "exp", "log": "ln", "log10": "log10"}  # 公式中的函数 -> Decimal的方法
+
+    def number(self, value):
+        if isinstance(value, float):
+            return decimal.Decimal(repr(value))
+        if isinstance(value, str):
+            value = Fraction(value)
+        if isinstance(value, Fraction):
+            with self.context():
+                return decimal.Decimal(value.numerator) / value.denominator
+        return value
+
+    def div(self, x, y):
+        if isinstance(x, (int, decimal.Decimal)) and isinstance(y, (int, decimal.Decimal)):
+            return decimal.Decimal(x) / y
+        return x / y
+
+    def constant(self, name : str):
+        """pi, e, tau 按精度计算"""
+        precision = self.precision or DEFAULT_PRECISION
+        if name == "pi":
+            return _decimal_pi(precision)
+        if name == "tau":
+            with self.context():
+                return 2 * _decimal_pi(precision + 1)
+        if name == "e":
+            with self.context():
+                return decimal.Decimal(1).exp()
+        return super().constant(name)
+
+    def names(self) -> dict:
+        """
+        pi, e, tau 与 sqrt, exp, log, log10 按精度计算; 其他函数(sin, cos等)仍按float计算, 只有约16位有效数字,
+        结果转换回Decimal, 否则 Decimal 与 float 相加等会出错
+        """
+        names = {}
+        for name, value in SafeEval.MATH_NAMES.items():
+            if isinstance(value, float):
+                names[name] = self.constant(name)
+            elif callable(value):
+                names[name] = self._func(value, self.FUNCS.get(name))
+        names["float"] = self._func(float, None)
+        names["math"] = types.SimpleNamespace(**names)
+        return names
+
+    def _func(self, func, method : str | None):
+        def wrapper(*args):
+            if method is not None and len(args) == 1 and isinstance(args[0], (int, decimal.Decimal)):
+                return getattr(decimal.Decimal(args[0]), method)()
+            result = func(*args)
+            return self.number(result) if isinstance(result, float) else result
+        wrapper.__name__ = func.__name__
+        return wrapper
+
+    def context(self):
+        return decimal.localcontext(decimal.Context(prec=self.precision or DEFAULT_PRECISION))
+
+
+BACKENDS = {cls.name: cls for cls in (Numbers, ExactNumbers, DecimalNumbers)}
+
+
+@functools.lru_cache(maxsize=None)
+def _decimal_pi(precision : int) -> decimal.Decimal:
+    """precision位有效数字的pi, 按decimal文档中的级数计算"""
+    with decimal.localcontext(decimal.Context(prec=precision + 2)):
+        three = decimal.Decimal(3)
+        last, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != last:
+            last = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+    with decimal.localcontext(decimal.Context(prec=precision)):
+        return +s
+
+
+def _normalize(value : Fraction):
+    return value.numerator if value.denominator == 1 else value
+
+
+@functools.lru_cache(maxsize=None)
+def numbers(backend : str = "float", precision : int | None = None) -> Numbers:
+    if backend not in BACKENDS:
+        raise SafeEval.EvalError("runtime", f"未知的数值类型 {backend}")
+    return BACKENDS[backend](precision if backend == "decimal" else None)
+
+
+class _Literals(ast.NodeTransformer):
+    """非float的数值类型: 公式中的小数换成预先转换好的常数, 除法换成 _div"""
+
+    def __init__(self, numbers : Numbers):
+        super().__init__()
+        self.numbers = numbers
+        self.constants = {}
+
+    def visit_Constant(self, node : ast.Constant):
+        if not isinstance(node.value, float):
+            return node
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = self.numbers.number(node.value)
+        return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+
+    def visit_BinOp(self, node : ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.copy_location(ast.Call(func=ast.Name(id="_div", ctx=ast.Load()),
+                                              args=[node.left, node.right], keywords=[]), node)
+        return node
+
+
+def _compile(tree : ast.Expression, numbers : Numbers, filename : str) -> tuple:
+    """:return: (代码, 求值用的名字)"""
+    names = SafeEval.namespace(**numbers.names())
+    if numbers.name != "float":
+        literals = _Literals(numbers)
+        tree = literals.visit(tree)
+        names.update(literals.constants, _div=numbers.div)
+    return SafeEval.compile_safe(tree, filename), names
+
+
+def to_floats(chunk) -> numpy.ndarray:
+    """iter_values 给出的一段结果 -> float64 数组"""
+    if isinstance(chunk, numpy.ndarray):
+        return chunk
+    return numpy.array([_to_float(v) for v in chunk], dtype=numpy.float64)
+
+
+def _join(chunks, count : int) -> numpy.ndarray:
+    result = numpy.empty(count, dtype=numpy.float64)
+    start = 0
+    for chunk in chunks:
+        result[start:start + len(chunk)] = to_floats(chunk)
+        start += len(chunk)
+    return result
+
+
+def _clip(chunks : list, count : int):
+    """已经算出的各段中的前count项"""
+    for chunk in chunks:
+        if count <= 0:
+            return
+        yield chunk[:count] if len(chunk) > count else chunk
+        count -= len(chunk)
+
+
+class ClosedForm(object):
+    """
+    编译后的通项公式 a[n] = f(n)
+    已经算出的项按段保存在 chunks 中; float64 时每段是数组, 其他数值类型是原来的值的列表
+    """
+
+    def __init__(self, expr : str, numbers : Numbers = Numbers()):
+        super().__init__()
+        self.source = expr.strip()
+        self.numbers = numbers
+        self.chunks : list = []
+        self.computed = 0
+        tree = SafeEval.parse(self.source)
+        self.cost = SafeEval.cost(tree)
+        self.code, self.names = _compile(tree, numbers, "<通项公式>")
+        self.vector_code = None
+        if numbers.name == "float":
+            try:
+                vector_tree = _Vectorizer().visit(SafeEval.parse(self.source))
+                self.vector_code = SafeEval.compile_safe(vector_tree, "<通项公式>")  # 常数的乘方仍然要检查大小
+            except _NotVectorizable as e:
+                logger.debug(f"{self.source} 不能整体计算({e}), 逐项计算")
+
+    @property
+    def vectorized(self) -> bool:
+        return self.vector_code is not None
+
+    def at(self, k : int):
+        """第k项, 按Python的规则计算(整数不会溢出)"""
+        with self.numbers.context():
+            return eval(self.code, {"__builtins__": {}}, dict(self.names, n=k))
+
+    def values(self, count : int) -> numpy.ndarray:
+        """前count项, float64; 无法计算或超出float范围的项为nan"""
+        return _join(self.iter_values(count), count)
+
+    def iter_values(self, count : int):
+        """分段给出前count项, 各段依次连接起来与 values(count) 相同; 已经算过的项不再计算"""
+        yield from _clip(self.chunks, count)
+        while self.computed < count:
+            chunk = None
+            if self.vector_code is not None:
+                chunk = self._vector_range(self.computed, min(self.computed + VECTOR_CHUNK, count))
+                if chunk is None:
+                    self.vector_code = None
+            if chunk is not None:
+                self._append(chunk)
+                yield chunk
+            else:
+                for chunk in self._iter_by_element(self.computed, count):
+                    self._append(chunk)
+                    yield chunk
+
+    def _append(self, chunk):
+        self.chunks.append(chunk)
+        self.computed += len(chunk)
+
+    def _vector_range(self, start : int, stop : int) -> numpy.ndarray | None:
+        """第start到stop-1项整体计算, 失败时返回None"""
+        with numpy.errstate(all="ignore"):
+            try:
+                result = eval(self.vector_code, {"__builtins__": {}},
+                              {"_funcs": _FUNCS, "_pow": SafeEval.safe_pow,
+                               "n": numpy.arange(start, stop, dtype=numpy.float64)})
+                return _finite(numpy.broadcast_to(numpy.asarray(result, dtype=numpy.float64), (stop - start,)).copy())
+            except SafeEval.EvalError:
+                raise
+            except (TypeError, ValueError, ArithmeticError) as e:
+                logger.debug(f"{self.source} 整体计算失败({e}), 逐项计算")
+                return None
+
+    def _iter_by_element(self, start : int, count : int):
+        namespace = dict(self.names)
+        builtins = {"__builtins__": {}}
+        budget = SafeEval.Budget()
+        convert = _to_float if self.numbers.name == "float" else SafeEval.check_value
+        failed = 0
+        chunk = []
+        last = time.monotonic()
+        with self.numbers.context():
+            for k in range(start, count):
+                namespace["n"] = k
+                budget.charge(self.cost)
+                try:
+                    chunk.append(convert(eval(self.code, builtins, namespace)))
+                except SafeEval.EvalError as e:
+                    # float64时, 单独一项的数值过大(乘方, 阶乘的参数)与整体计算一样记为nan, 不影响其他项
+                    if self.numbers.name != "float" or e.kind != "budget":
+                        raise
+                    if not failed:
+                        logger.error(f"计算通项时出错(n={k}) : {e}")
+                        first_error = e
+                    failed += 1
+                    chunk.append(math.nan)
+                except (ArithmeticError, ValueError, TypeError) as e:
+                    if not failed:
+                        logger.error(f"计算通项时出错(n={k}) : {e}")
+                        first_error = e
+                    failed += 1
+                    chunk.append(math.nan)
+                if time.monotonic() - last > PROGRESS_INTERVAL:
+                    yield self._chunk(chunk)
+                    chunk = []
+                    last = time.monotonic()
+        if failed:
+            logger.error(f"共{failed}项无法计算")
+            if start == 0 and failed == count:  # 没有一项能算出来, 多半是公式本身的问题, 报告给界面; 接着算的部分不算
+                raise SafeEval.EvalError("runtime", f"{type(first_error).__name__}: {first_error}")
+        if chunk:
+            yield self._chunk(chunk)
+
+    def _chunk(self, values : list):
+        return numpy.array(values, dtype=numpy.float64) if self.numbers.name == "float" else values
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_closed_form(expr : str, backend : str = "float", precision : int | None = None) -> ClosedForm:
+    return ClosedForm(expr, numbers(backend, precision))
+
+
+class _NotLinear(Exception):
+    pass
+
+
+_CONSTANT_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Pow: SafeEval.safe_pow}
+
+
+def _constant(node : ast.expr, numbers : Numbers = Numbers()):
+    """不含 a 与 n 的常数, 按 numbers 的数值类型计算"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return numbers.number(node.value) if isinstance(node.value, float) else node.value
+    if isinstance(node, ast.Name) and isinstance(SafeEval.MATH_NAMES.get(node.id), float):
+        return numbers.constant(node.id)
+    if isinstance(node, ast.Attribute) and isinstance(SafeEval.MATH_NAMES.get(node.attr), float):
+        return numbers.constant(node.attr)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _constant(node.operand, numbers)
+        return -value if isinstance(node.op, ast.USub) else value
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
+        left, right = _constant(node.left, numbers), _constant(node.right, numbers)
+        op = numbers.div if isinstance(node.op, ast.Div) else _CONSTANT_OPS[type(node.op)]
+        try:
+            with numbers.context():
+                return op(left, right)
+        except (ArithmeticError, TypeError) as e:
+            raise _NotLinear(str(e))
+    raise _NotLinear(type(node).__name__)
+
+
+def _lag(node : ast.expr) -> int:
+    """a[n-k] 中的 k"""
+    index = node.slice
+    if isinstance(index, ast.BinOp) and isinstance(index.op, ast.Sub) and isinstance(index.left, ast.Name) \
+            and index.left.id == "n":
+        lag = _constant(index.right)
+        if isinstance(lag, int) and lag >= 1:
+            return lag
+    raise _NotLinear(ast.unparse(node))
+
+
+def _linear_form(node : ast.expr, numbers : Numbers = Numbers()) -> tuple[dict[int, float], float]:
+    """
+    把表达式展开为 sum(coeffs[k] * a[n-k]) + const, 系数按 numbers 的数值类型计算
+    :raise _NotLinear: 不是常系数线性的
+    """
+    if isinstance(node, ast.Subscript):
+        return {_lag(node): 1}, 0
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        coeffs, const = _linear_form(node.operand, numbers)
+        if isinstance(node.op, ast.USub):
+            return {k: -c for k, c in coeffs.items()}, -const
+        return coeffs, const
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+        left, left_const = _linear_form(node.left, numbers)
+        right, right_const = _linear_form(node.right, numbers)
+        sign = 1 if isinstance(node.op, ast.Add) else -1
+        coeffs = dict(left)
+        for k, c in right.items():
+            coeffs[k] = coeffs.get(k, 0) + sign * c
+        return coeffs, left_const + sign * right_const
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+        for scale, other in ((node.right, node.left), (node.left, node.right)):
+            try:
+                factor = _constant(scale, numbers)
+            except _NotLinear:
+                continue
+            coeffs, const = _linear_form(other, numbers)
+            return {k: c * factor for k, c in coeffs.items()}, const * factor
+        raise _NotLinear("两项相乘")
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+        factor = _constant(node.right, numbers)
+        if factor == 0:
+            raise _NotLinear("除以0")
+        coeffs, const = _linear_form(node.left, numbers)
+        with numbers.context():
+            return {k: numbers.div(c, factor) for k, c in coeffs.items()}, numbers.div(const, factor)
+    return {}, _constant(node, numbers)
+
+
+def _mat_mul(x : list[list[int]], y : list[list[int]], modulus : int | None) -> list[list[int]]:
+    """modulus 为None时不取模, 每个元素检查大小"""
+    columns = list(zip(*y))
+    if modulus is None:
+        return [[SafeEval.check_value(sum(p * q for p, q in zip(row, column))) for column in columns] for row in x]
+    return [[sum(p * q for p, q in zip(row, column)) % modulus for column in columns] for row in x]
+
+
+class Recurrence(object):
+    """
+    编译后的递推式, a 为已经算出的项(含初始项), n 为正在计算的项的下标
+    :param initial: 初始项 a[0], a[1], ..., 可以是文本(例如 "1/3"), 按 numbers 的数值类型转换
+    float64的常系数线性递推用 lfilter 整体计算, 结果按段保存在 chunks 中; 其他情况逐项计算, 所有项保存在 a 中
+    """
+
+    def __init__(self, expr : str, initial : tuple, numbers : Numbers = Numbers()):
+        super().__init__()
+        self.source = expr.strip()
+        self.numbers = numbers
+        self.initial = tuple(numbers.number(v) for v in initial)
+        tree = SafeEval.parse(self.source, variables=("a", "n"))
+        self.cost = SafeEval.cost(tree)
+        self.coeffs : list[float] | None = None  # 线性时: [c1, ..., ck]
+        self.const = 0
+        try:
+            with numbers.context():  # 系数相乘相加时按精度舍入
+                coeffs, const = _linear_form(tree.body, numbers)
+            order = max(coeffs, default=1)
+            if order > len(self.initial):
+                raise _NotLinear(f"需要{order}个初始项")
+            self.coeffs = [coeffs.get(k, 0) for k in range(1, order + 1)]
+            self.const = const
+        except _NotLinear as e:
+            logger.debug(f"{self.source} 不是常系数线性递推({e}), 逐项计算")
+        self.code, self.names = _compile(tree, numbers, "<递推式>")
+        self.a = list(self.initial)
+        self.chunks : list[numpy.ndarray] = []
+        if self.filtered:
+            self.chunks.append(numpy.array([_to_float(v) for v in self.initial], dtype=numpy.float64))
+
+    @property
+    def linear(self) -> bool:
+        return self.coeffs is not None
+
+    @property
+    def filtered(self) -> bool:
+        """是否整体计算"""
+        return self.coeffs is not None and self.numbers.name == "float" and len(self.initial) > 0
+
+    def values(self, count : int) -> numpy.ndarray:
+        """前count项, float64; 出错后的项为nan"""
+        return _join(self.iter_values(count), count)
+
+    def iter_values(self, count : int):
+        """分段给出前count项, 已经算过的项不再计算"""
+        if self.filtered:
+            yield from _clip(self.chunks, count)
+            computed = sum(len(chunk) for chunk in self.chunks)
+            if computed < count:
+                chunk = self._linear_tail(count - computed)
+                self.chunks.append(chunk)
+                yield chunk
+            return
+        if self.a:
+            yield self._chunk(self.a[:count])
+        if len(self.a) < count:
+            yield from self._iter_by_element(count)
+
+    def _chunk(self, values : list):
+        return numpy.array([_to_float(v) for v in values], dtype=numpy.float64) \
+            if self.numbers.name == "float" else values
+
+    def _linear_tail(self, length : int) -> numpy.ndarray:
+        """接着已经算出的项再算length项"""
+        k = len(self.coeffs)
+        head = numpy.concatenate(self.chunks[-k:])[-k:]
+        with numpy.errstate(all="ignore"):
+            if lfilter is not None:
+                # a[n] - c1*a[n-1] - ... - ck*a[n-k] = d * 1
+                b, a = [float(self.const)], [1.0] + [-float(c) for c in self.coeffs]
+                zi = lfiltic(b, a, head[::-1], [1.0])
+                tail, _ = lfilter(b, a, numpy.ones(length), zi=zi)
+                return _finite(tail)
+            return _finite(self._linear_loop(head, length))
+
+    def _linear_loop(self, head : numpy.ndarray, length : int) -> numpy.ndarray:
+        coeffs = [float(c) for c in self.coeffs]
+        window = head[len(head) - len(coeffs):].tolist()[::-1]  # window[i] = a[n-1-i]
+        const = float(self.const)
+        tail = [0.0] * length
+        for i in range(length):
+            value = const
+            for c, v in zip(coeffs, window):
+                value += c * v
+            tail[i] = value
+            window.insert(0, value)
+            window.pop()
+        return numpy.array(tail, dtype=numpy.float64)
+
+    def _iter_by_element(self, count : int):
+        """接着 a 中已经算出的项计算到第count-1项, 出错时之后的项为nan"""
+        a = self.a
+        namespace = dict(self.names, a=a)
+        builtins = {"__builtins__": {}}
+        budget = SafeEval.Budget()
+        sent = len(a)
+        last = time.monotonic()
+        with self.numbers.context():
+            for k in range(len(a), count):
+                namespace["n"] = k
+                budget.charge(self.cost)
+                try:
+                    a.append(SafeEval.check_value(eval(self.code, builtins, namespace)))
+                except SafeEval.EvalError:
+                    raise
+                except IndexError as e:
+                    logger.error(f"初始项设置错误 : {e}")
+                    break
+                except TypeError as e:  # 数值类型不能混用等, 公式本身的问题
+                    raise SafeEval.EvalError("runtime", f"计算递推式时出错(n={k}) : {e}") from e
+                except (ArithmeticError, ValueError) as e:
+                    logger.error(f"计算递推式时出错(n={k}) : {e}")
+                    break
+                if time.monotonic() - last > PROGRESS_INTERVAL:
+                    yield self._chunk(a[sent:])
+                    sent = len(a)
+                    last = time.monotonic()
+        stop = min(len(a), count)
+        yield self._chunk(a[sent:stop] + [math.nan] * (count - max(stop, sent)))  # 出错之后的项为nan
+
+    def term(self, index : int, modulus : int | None = None):
+        """
+        单独计算第index项, 线性递推用矩阵快速幂, 只需 O(k^3 log index) 次运算
+        :param modulus: 给出时按整数取模计算(系数与初始项必须是整数), 否则按数值类型计算
+        """
+        if index < 0:
+            raise SafeEval.EvalError("runtime", "项数不能为负")
+        _check_modulus(modulus)
+        if index < len(self.initial):
+            value = self.initial[index]
+            return value % modulus if modulus is not None else value
+        if self.coeffs is None:
+            if index > 10 ** 6:
+                raise SafeEval.EvalError("runtime", "只有常系数线性递推式可以直接计算很远的项")
+            for _ in self._iter_by_element(index + 1):
+                pass
+            if index >= len(self.a):
+                raise SafeEval.EvalError("runtime", f"计算到第{len(self.a)}项时出错")
+            return self.a[index] % modulus if modulus is not None else self.a[index]
+
+        # 状态 [a[n-1], ..., a[n-k], 1], 每乘一次转移矩阵前进一项
+        k = len(self.coeffs)
+        matrix = [list(self.coeffs) + [self.const]]
+        matrix += [[1 if j == i else 0 for j in range(k + 1)] for i in range(k - 1)]
+        matrix.append([0] * k + [1])
+        state = [self.initial[len(self.initial) - 1 - i] for i in range(k)] + [1]
+        power = index - len(self.initial) + 1
+
+        if modulus is not None or self.numbers.name != "float":
+            if modulus is not None:
+                values = [float(x) for row in matrix for x in row] + [float(x) for x in state]
+                if not all(v.is_integer() for v in values):
+                    raise SafeEval.EvalError("runtime", "取模计算要求系数与初始项都是整数")
+                matrix = [[int(x) % modulus for x in row] for row in matrix]
+                state = [int(x) for x in state]
+            with self.numbers.context():
+                result = [[1 if i == j else 0 for j in range(k + 1)] for i in range(k + 1)]
+                while power:
+                    if power & 1:
+                        result = _mat_mul(result, matrix, modulus)
+                    power >>= 1
+                    if power:
+                        matrix = _mat_mul(matrix, matrix, modulus)
+                value = sum(x * s for x, s in zip(result[0], state))
+            return value % modulus if modulus is not None else SafeEval.check_value(value)
+
+        with numpy.errstate(all="ignore"):
+            result = numpy.linalg.matrix_power(numpy.array(matrix, dtype=numpy.float64), power)
+            value = float(result[0] @ numpy.array(state, dtype=numpy.float64))
+        if not math.isfinite(value):
+            raise SafeEval.EvalError("runtime", "结果超出浮点数的范围, 可以取模计算或使用精确计算")
+        return value
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_recurrence(expr : str, initial : tuple, backend : str = "float",
+                       precision : int | None = None) -> Recurrence:
+    return Recurrence(expr, initial, numbers(backend, precision))
+
+
+_INDEX = re.compile(r"(\d+)(?:(?:\^|\*\*)(\d+)|[eE](\d+))?")
+
+
+def parse_index(text : str) -> int:
+    """
+    项数: 整数, 或写成 10^9, 10**9, 1e9; 只按这几种写法解析, 不对输入求值
+    :raise EvalError: 不是这几种写法, 或结果过大
+    """
+    match = _INDEX.fullmatch(text.replace(" ", "").replace("_", ""))
+    if match is None:
+        raise SafeEval.EvalError("syntax", f"项数必须是整数, 可以写成 10^9 或 1e9: {text.strip()}")
+    base, exponent, decimal_exponent = match.groups()
+    if exponent is not None:
+        return SafeEval.safe_pow(int(base), int(exponent))
+    if decimal_exponent is not None:
+        return int(base) * SafeEval.safe_pow(10, int(decimal_exponent))
+    return int(base)
+
+
+def _compiled(mode : int, expr : str, initial : tuple, backend : str, precision : int | None):
+    if backend != "decimal":
+        precision = None  # 其他数值类型与精度无关, 共用缓存
+    try:
+        if mode == RECURRENCE:
+            return compile_recurrence(expr, tuple(initial), backend, precision)
+        if mode == CLOSED_FORM:
+            return compile_closed_form(expr, backend, precision)
+    except SafeEval.EvalError:
+        raise
+    except (ValueError, ZeroDivisionError, decimal.InvalidOperation) as e:  # 初始项不是数字
+        raise SafeEval.EvalError("runtime", f"初始项有误: {e}") from e
+    raise SafeEval.EvalError("runtime", f"未知的模式 {mode}")
+
+
+def compute_values(mode : int, expr : str, initial : tuple, count : int,
+                   backend : str = "float", precision : int | None = None) -> numpy.ndarray:
+    """前count项(float64), 可以放进 SafeEval.run 中执行"""
+    return _compiled(mode, expr, initial, backend, precision).values(count)
+
+
+def iter_values(mode : int, expr : str, initial : tuple, count : int,
+                backend : str = "float", precision : int | None = None):
+    """
+    分段给出前count项, 可以放进 SafeEval.run 中执行, 每段通过 on_chunk 送回
+    float64时每段是数组, 其他数值类型是原来的值的列表(用 to_floats 转换后绘图)
+    """
+    return _compiled(mode, expr, initial, backend, precision).iter_values(count)
+
+
+def _check_modulus(modulus : int | None):
+    if modulus is not None and modulus <= 0:
+        raise SafeEval.EvalError("runtime", f"模数必须是正整数: {modulus}")
+
+
+def compute_term(mode : int, expr : str, initial : tuple, index : int, modulus : int | None = None,
+                 backend : str = "float", precision : int | None = None):
+    """单独一项, 可以放进 SafeEval.run 中执行"""
+    _check_modulus(modulus)
+    sequence = _compiled(mode, expr, initial, backend, precision)
+    if mode == RECURRENCE:
+        return sequence.term(index, modulus)
+    value = sequence.at(index)
+    return value % modulus if modulus is not None else value
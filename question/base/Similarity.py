@@ -0,0 +1,262 @@
+"""
+按题面内容查找相似题目, 补充标签推荐找不到的题
+题面用哈希技巧映射为定长的词频向量, 查询时乘以idf并归一化, 用矩阵乘法一次算出所有余弦相似度
+词频向量按题面内容的hash(保存在快照中)缓存在磁盘上, 题库变化后只需计算新题面的向量, 不再用到的向量在重建时删除
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import weakref
+import zlib
+from collections import Counter
+
+import numpy
+
+from question.base import Questions, Search, Snapshot
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+DIM = 512
+DEFAULT_CACHE = os.path.join("cache", "embeddings")
+CHUNK_ROWS = 16384  # 分块计算, 缓存文件很大时也不必整个读进内存
+
+
+content_hash = Snapshot.content_hash
+
+
+def embed(text : str) -> numpy.ndarray:
+    """哈希词频向量, 用crc32保证跨进程稳定, 另用一位决定符号以抵消碰撞"""
+    vector = numpy.zeros(DIM, dtype=numpy.float32)
+    for token, tf in Counter(Search.tokenize(text)).items():
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % DIM] += (1.0 if h & 0x80000000 else -1.0) * (1 + math.log(tf))
+    return vector
+
+
+class VectorCache(object):
+    """
+    磁盘上的向量缓存: <path>.npy 为向量矩阵, <path>.keys 为每一行对应的内容hash
+    """
+
+    def __init__(self, path : str = DEFAULT_CACHE):
+        super().__init__()
+        self.path = path
+        self.keys : dict[str, int] = {}
+#                        hash : 行号
+        self.matrix = numpy.zeros((0, DIM), dtype=numpy.float32)
+        if os.path.exists(self.path + ".keys") and os.path.exists(self.path + ".npy"):
+            try:
+                matrix = numpy.load(self.path + ".npy", mmap_mode="r")
+                with open(self.path + ".keys", "r", encoding="utf-8") as file:
+                    keys = file.read().split()
+                if matrix.shape == (len(keys), DIM):
+                    self.matrix = matrix
+                    self.keys = {key: row for row, key in enumerate(keys)}
+                else:
+                    logger.warning(f"向量缓存与索引不一致, 已忽略 {self.path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取向量缓存失败 {self.path} : {e}")
+
+    def get(self, key : str) -> numpy.ndarray | None:
+        """返回复制的向量, 不引用映射的文件, 保存时才能关闭映射"""
+        row = self.keys.get(key)
+        return None if row is None else numpy.array(self.matrix[row])
+
+    def _release(self):
+        """关闭对缓存文件的映射, Windows上映射着的文件不能被替换"""
+        mmap = getattr(self.matrix, "_mmap", None)
+        self.matrix = numpy.asarray(self.matrix).copy() if mmap is not None else self.matrix
+        if mmap is not None:
+            try:
+                mmap.close()
+            except BufferError as e:
+                logger.warning(f"向量缓存仍被引用, 无法关闭 {self.path} : {e}")
+
+    def save(self, new_vectors : dict[str, numpy.ndarray], live_keys : set[str] | None = None):
+        """
+        :param live_keys: 题库中现在的全部hash, 给出时删掉已经不用的向量(题目被删除或修改)
+        """
+        stale = [key for key in self.keys if key not in live_keys] if live_keys is not None else []
+        if not new_vectors and not stale:
+            return
+        kept = [key for key in self.keys if live_keys is None or key in live_keys]
+        parts = [numpy.asarray(self.matrix)[[self.keys[key] for key in kept]]]
+        if new_vectors:
+            parts.append(numpy.stack(list(new_vectors.values())))
+        matrix = numpy.concatenate(parts).astype(numpy.float32, copy=False)
+        keys = kept + list(new_vectors)
+        self._release()
+        self.matrix = matrix
+        self.keys = {key: row for row, key in enumerate(keys)}
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # 先写临时文件再替换
+            numpy.save(self.path + ".tmp.npy", matrix)
+            with open(self.path + ".keys.tmp", "w", encoding="utf-8") as file:
+                file.write("\n".join(keys))
+            os.replace(self.path + ".tmp.npy", self.path + ".npy")
+            os.replace(self.path + ".keys.tmp", self.path + ".keys")
+        except OSError as e:
+            logger.warning(f"写入向量缓存失败, 本次只保存在内存中 {self.path} : {e}")
+            return
+        self.matrix = numpy.load(self.path + ".npy", mmap_mode="r")
+        logger.debug(f"向量缓存: 新增{len(new_vectors)}个, 删除{len(stale)}个")
+
+
+class SimilarityIndex(Questions.LibraryListener):
+    """
+    题库的相似度索引, 在后台线程中建立(start_build), 建好之前查询返回空列表
+    向量按题面的hash从缓存中取, hash来自快照, 只有缓存中没有的题面才从快照中批量读取, 都不缓存在题目上
+    建好之后随题库的增删增量更新, 每题只计算一个向量; 查询时才重新乘以idf并归一化
+    """
+
+    def __init__(self, lib : Questions.QuestionsManager, cache : VectorCache):
+        super().__init__()
+        self.lib = weakref.proxy(lib)
+        self.cache = cache
+        self.vectors : dict[int, numpy.ndarray] = {}
+#                           id : 词频向量(未乘idf)
+        self.ready = False
+        self.version = 0  # 题库变化时加一, 后台建立期间变化过时重新建立
+        self.lock = threading.Lock()
+        self.thread : threading.Thread | None = None
+        self.ids : list[int] = []
+        self.rows : dict[int, int] = {}
+        self.normed : numpy.ndarray | None = None  # 乘以idf并归一化后的矩阵
+        self.idf : numpy.ndarray | None = None
+
+    def _build(self):
+        while True:
+            version = self.version
+            hashes = self.lib.surface_hashes()
+            vectors : dict[int, numpy.ndarray] = {}
+            missing : dict[int, str] = {}
+            for question_id, key in hashes.items():
+                vector = self.cache.get(key)
+                if vector is None:
+                    missing[question_id] = key
+                else:
+                    vectors[question_id] = vector
+            new_vectors : dict[str, numpy.ndarray] = {}
+            for question_id, surface, *_ in self.lib.iter_fields(missing):
+                key = missing[question_id]
+                vector = new_vectors.get(key)
+                if vector is None:
+                    vector = new_vectors[key] = embed(surface or "")
+                vectors[question_id] = vector
+            self.cache.save(new_vectors, set(hashes.values()))
+            with self.lock:
+                if self.version == version:
+                    self.vectors = vectors
+                    self.normed = None
+                    self.ready = True
+                    logger.debug(f"已建立相似度索引, 共{len(vectors)}题, 新计算{len(new_vectors)}个向量")
+                    return
+
+    def build(self):
+        """建立索引, 可以在后台线程中调用"""
+        try:
+            self._build()
+        except ReferenceError:  # 题库已经释放
+            pass
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"建立相似度索引失败 : {e}")
+
+    def start_build(self):
+        """在后台线程中建立索引, 正在建立或已经建好时不重复"""
+        if self.ready or (self.thread is not None and self.thread.is_alive()):
+            return
+        self.thread = threading.Thread(target=self.build, name="SimilarityIndex.build", daemon=True)
+        self.thread.start()
+
+    def _normalize(self):
+        with self.lock:
+            self.ids = list(self.vectors)
+            matrix = numpy.zeros((len(self.ids), DIM), dtype=numpy.float32)
+            for row, question_id in enumerate(self.ids):
+                matrix[row] = self.vectors[question_id]
+        self.rows = {question_id: row for row, question_id in enumerate(self.ids)}
+        df = numpy.count_nonzero(matrix, axis=0)
+        self.idf = (numpy.log((1 + len(self.ids)) / (1 + df)) + 1).astype(numpy.float32)
+        matrix *= self.idf
+        norms = numpy.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self.normed = matrix / norms
+
+    def _query_vector(self, question : Questions.Question) -> numpy.ndarray:
+        question_id = int(question.question_id)
+        if question_id in self.rows:
+            return self.normed[self.rows[question_id]]
+        vector = embed(question.surface or "") * self.idf
+        norm = numpy.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def similar_ids(self, question : Questions.Question, limit : int = 10) -> list[tuple[int, float]]:
+        """
+        :return: [(题目id, 余弦相似度)], 不含该题本身; 索引还没有建好时为空
+        """
+        if not self.ready:
+            self.start_build()
+            return []
+        if self.normed is None:
+            self._normalize()
+        if not self.ids:
+            return []
+        query = self._query_vector(question)
+        scores = numpy.empty(len(self.ids), dtype=numpy.float32)
+        for start in range(0, len(self.ids), CHUNK_ROWS):
+            scores[start:start + CHUNK_ROWS] = self.normed[start:start + CHUNK_ROWS] @ query
+        own_row = self.rows.get(int(question.question_id))
+        if own_row is not None:
+            scores[own_row] = -numpy.inf
+
+        k = min(limit, len(self.ids) - (own_row is not None))
+        if k <= 0:
+            return []
+        top = numpy.argpartition(scores, -k)[-k:]
+        top = top[numpy.argsort(-scores[top], kind="stable")]
+        return [(self.ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def similar(self, question : Questions.Question, limit : int = 10) -> list[Questions.Question]:
+        return [self.lib[question_id] for question_id, _ in self.similar_ids(question, limit)]
+
+    def question_added(self, question : Questions.Question):
+        with self.lock:
+            self.version += 1
+            if not self.ready:
+                return
+        question_id = int(question.question_id)
+        surface = self.lib.peek_fields(question_id)[0] or ""
+        vector = self.cache.get(content_hash(surface))  # 新的向量在下次整体建立时写入缓存
+        with self.lock:
+            self.vectors[question_id] = embed(surface) if vector is None else vector
+            self.normed = None
+
+    def question_removed(self, question : Questions.Question):
+        with self.lock:
+            self.version += 1
+            self.vectors.pop(int(question.question_id), None)
+            self.normed = None
+
+    def library_cleared(self):
+        with self.lock:
+            self.version += 1
+            self.ready = False
+            self.vectors = {}
+            self.normed = None
+
+
+_indexes : "weakref.WeakKeyDictionary[Questions.QuestionsManager, SimilarityIndex]" = weakref.WeakKeyDictionary()
+
+
+def get_index(lib : Questions.QuestionsManager, cache_path : str = DEFAULT_CACHE) -> SimilarityIndex:
+    index = _indexes.get(lib)
+    if index is None:
+        index = SimilarityIndex(lib, VectorCache(cache_path))
+        lib.add_listener(index)
+        _indexes[lib] = index
+    return index
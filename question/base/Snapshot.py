@@ -0,0 +1,174 @@
+"""
+题库的编译快照, 由question.json生成的sqlite文件
+以problem_id为主键, 可以单独读取某一道题而不必解析整个题库
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import weakref
+from contextlib import closing
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".qlib.sqlite"
+BRIEF_LENGTH = 20
+
+Row = tuple[int, str, str, str, str, str, str]
+#          id, surface, answer(json), analysis(json), options(json), tags(json), difficulty
+LightRow = tuple[int, str, str, str]
+#               id, brief, tags(json), difficulty
+
+
+def content_hash(text : str) -> str:
+    """题面的hash, 保存在快照中, 相似度索引用它查找缓存的向量而不必读取题面"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def snapshot_path(source_path : str) -> str:
+    """question.json -> question.qlib.sqlite"""
+    return os.path.splitext(source_path)[0] + SNAPSHOT_SUFFIX
+
+
+def is_fresh(source_path : str, snap_path : str | None = None) -> bool:
+    """快照存在, 版本一致, 且比源文件新"""
+    snap_path = snap_path or snapshot_path(source_path)
+    if not os.path.exists(snap_path):
+        return False
+    if os.stat(snap_path).st_mtime_ns < os.stat(source_path).st_mtime_ns:
+        return False
+    try:
+        with closing(sqlite3.connect(snap_path)) as conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"快照损坏 {snap_path} : {e}")
+        return False
+    return version is not None and int(version[0]) == SNAPSHOT_VERSION
+
+
+def to_row(question) -> Row:
+    """注意: 写入快照的题目必须已经加载了全部字段"""
+    return (int(question.question_id), question.surface,
+            json.dumps(question.answer, ensure_ascii=False),
+            json.dumps(question.analysis, ensure_ascii=False),
+            json.dumps(list(question.options), ensure_ascii=False),
+            json.dumps(list(question.tags), ensure_ascii=False),
+            str(question.difficulty))
+
+
+def build(snap_path : str, questions : Iterable) -> int:
+    """
+    从题目对象生成快照, 先写临时文件再替换, 避免读到一半的快照
+    :return: 写入的题目数
+    """
+    tmp_path = snap_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    count = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("""
+            CREATE TABLE questions (
+                problem_id INTEGER PRIMARY KEY,
+                brief TEXT,
+                surface TEXT,
+                answer TEXT,
+                analysis TEXT,
+                options TEXT,
+                tags TEXT,
+                difficulty TEXT,
+                surface_hash TEXT
+            )""")
+        for q in questions:
+            row = to_row(q)
+            conn.execute("INSERT OR REPLACE INTO questions "
+                         "(problem_id, brief, surface, answer, analysis, options, tags, difficulty, surface_hash) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (row[0], row[1][:BRIEF_LENGTH]) + row[1:] + (content_hash(row[1]),))
+            count += 1
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(SNAPSHOT_VERSION),))
+        conn.commit()
+    except sqlite3.Error:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, snap_path)
+    logger.debug(f"已生成快照 {snap_path}, 共{count}题")
+    return count
+
+
+def iter_rows(snap_path : str) -> Iterator[Row]:
+    with closing(sqlite3.connect(snap_path)) as conn:
+        yield from conn.execute(
+            "SELECT problem_id, surface, answer, analysis, options, tags, difficulty "
+            "FROM questions ORDER BY problem_id")
+
+
+def read_row(snap_path : str, question_id : int) -> Row | None:
+    """按id单独读取一道题, 快照需已存在"""
+    with closing(sqlite3.connect(snap_path)) as conn:
+        return conn.execute(
+            "SELECT problem_id, surface, answer, analysis, options, tags, difficulty "
+            "FROM questions WHERE problem_id = ?", (int(question_id),)).fetchone()
+
+
+def iter_light_rows(snap_path : str) -> Iterator[LightRow]:
+    """只读取列表, 目录等界面需要的字段, 题面与解析等由Reader按需读取"""
+    with closing(sqlite3.connect(snap_path)) as conn:
+        yield from conn.execute(
+            "SELECT problem_id, brief, tags, difficulty FROM questions ORDER BY problem_id")
+
+
+def iter_hashes(snap_path : str) -> Iterator[tuple[int, str]]:
+    """(id, 题面的hash), 不读取题面"""
+    with closing(sqlite3.connect(snap_path)) as conn:
+        yield from conn.execute("SELECT problem_id, surface_hash FROM questions ORDER BY problem_id")
+
+
+class Reader(object):
+    """
+    保持一个打开的连接, 供懒加载的题目按id读取大字段
+    """
+
+    def __init__(self, snap_path : str):
+        super().__init__()
+        self.snap_path = snap_path
+        self.conn = sqlite3.connect(snap_path, check_same_thread=False)
+        self.pending : weakref.WeakSet = weakref.WeakSet()
+#                                       还没有读取大字段的对象, 不持有它们
+
+    def register(self, item):
+        """item 第一次访问大字段时才用本对象读取, 需要有 load_fields 方法"""
+        self.pending.add(item)
+
+    def read_fields(self, question_id : int) -> tuple[str, object, object, tuple[str, ...]]:
+        """
+        :return: (题面, 答案, 解析, 选项)
+        """
+        row = self.conn.execute(
+            "SELECT surface, answer, analysis, options FROM questions WHERE problem_id = ?",
+            (int(question_id),)).fetchone()
+        if row is None:
+            raise KeyError(f"快照{self.snap_path}中没有题目{question_id}")
+        surface, answer, analysis, options = row
+        return surface, json.loads(answer), json.loads(analysis), tuple(json.loads(options))
+
+    def retire(self):
+        """
+        题库不再使用这个快照: 其他地方仍持有的未加载对象先读取大字段, 然后关闭连接
+        题库本身的题目应当先释放, 这里只剩下窗口等处持有的少数几个
+        """
+        for item in list(self.pending):
+            item.load_fields()
+        self.pending.clear()
+        self.close()
+
+    def close(self):
+        self.conn.close()
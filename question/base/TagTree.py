@@ -0,0 +1,118 @@
+"""
+目录树: 题库 -> 标签 -> 难度 -> 题目
+未展开的子树合并为一个带题目数的节点, 只有可见的一层会发送给前端
+"""
+import logging
+
+from question.base import Questions
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(format='%(levelname)s:%(message)s')
+logger.setLevel(logging.DEBUG)
+
+ROOT_ID = "root"
+
+
+def tag_node_id(tag : str) -> str:
+    return f"tag::{tag}"
+
+
+def band_node_id(tag : str, difficulty : Questions.Difficulty) -> str:
+    return f"band::{int(difficulty)}::{tag}"
+
+
+def more_node_id(tag : str, difficulty : Questions.Difficulty) -> str:
+    return f"more::{int(difficulty)}::{tag}"
+
+
+def question_node_id(tag : str, question_id : int) -> str:
+    # 同一道题可能出现在多个标签下, id中带上标签
+    return f"q::{question_id}::{tag}"
+
+
+class TagTree(object):
+    """
+    :param page_size: 展开一个难度时一次显示的题目数, 其余的收在"更多"节点里
+    """
+
+    def __init__(self, lib : Questions.QuestionsManager, page_size : int = 30):
+        super().__init__()
+        self.lib = lib
+        self.page_size = page_size
+        self.expanded_tags : set[str] = set()
+        self.expanded_bands : dict[tuple[str, Questions.Difficulty], int] = {}
+#                                  (标签, 难度) : 已显示的题目数
+
+    def band_ids(self, tag : str, difficulty : Questions.Difficulty) -> list[int]:
+        tag_ids = self.lib.ids_by_tag(tag)
+        difficulty_ids = self.lib.ids_by_difficulty(difficulty)
+        small, large = sorted((tag_ids, difficulty_ids), key=len)
+        return sorted(i for i in small if i in large)
+
+    def click(self, node_id : str) -> int | None:
+        """
+        展开/折叠节点
+        :return: 点击的是题目时返回题目id, 否则返回None
+        """
+        kind, _, rest = node_id.partition("::")
+        if kind == "tag":
+            if rest in self.expanded_tags:
+                self.expanded_tags.discard(rest)
+                for key in [key for key in self.expanded_bands if key[0] == rest]:
+                    del self.expanded_bands[key]
+            else:
+                self.expanded_tags.add(rest)
+        elif kind in ("band", "more"):
+            difficulty, _, tag = rest.partition("::")
+            key = (tag, Questions.Difficulty(int(difficulty)))
+            if kind == "more":
+                self.expanded_bands[key] = self.expanded_bands.get(key, 0) + self.page_size
+            elif key in self.expanded_bands:
+                del self.expanded_bands[key]
+            else:
+                self.expanded_bands[key] = self.page_size
+        elif kind == "q":
+            return int(rest.partition("::")[0])
+        elif node_id == ROOT_ID:
+            self.expanded_tags.clear()
+            self.expanded_bands.clear()
+        else:
+            logger.warning(f"未知的节点 {node_id}")
+        return None
+
+    def visible(self) -> tuple[list[dict], list[tuple[str, str]]]:
+        """
+        当前可见的节点与连线
+        节点: {"id", "tag", "name", "count", "kind"}, tag为点击时回传的值, 与id相同
+        """
+        nodes = [self._node(ROOT_ID, "题库", len(self.lib), "root")]
+        links = []
+        tags = sorted(self.lib.all_tags(), key=lambda t: (-len(self.lib.ids_by_tag(t)), t))
+        for tag in tags:
+            tag_id = tag_node_id(tag)
+            nodes.append(self._node(tag_id, tag, len(self.lib.ids_by_tag(tag)), "tag"))
+            links.append((ROOT_ID, tag_id))
+            if tag not in self.expanded_tags:
+                continue
+
+            for difficulty in Questions.Difficulty:
+                ids = self.band_ids(tag, difficulty)
+                if not ids:
+                    continue
+                band_id = band_node_id(tag, difficulty)
+                nodes.append(self._node(band_id, difficulty.label, len(ids), "band"))
+                links.append((tag_id, band_id))
+                shown = self.expanded_bands.get((tag, difficulty), 0)
+                for question_id in ids[:shown]:
+                    q_id = question_node_id(tag, question_id)
+                    nodes.append(self._node(q_id, self.lib[question_id].brief[:5], 0, "question"))
+                    links.append((band_id, q_id))
+                if 0 < shown < len(ids):
+                    more_id = more_node_id(tag, difficulty)
+                    nodes.append(self._node(more_id, "更多", len(ids) - shown, "more"))
+                    links.append((band_id, more_id))
+        return nodes, links
+
+    @staticmethod
+    def _node(node_id : str, name : str, count : int, kind : str) -> dict:
+        return {"id": node_id, "tag": node_id, "name": name, "count": count, "kind": kind}
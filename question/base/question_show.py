@@ -1,9 +1,11 @@
 import sys
+import multiprocessing
 import os
+import json
+import time
 from PyQt6 import QtCore, QtWidgets, QtGui, QtWebChannel
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-import markdown
-from question.base import Questions, Calculator, RightBarWeb
+from question.base import AppScheme, Questions, Calculator, History, MathRender, RightBarWeb, Recommend, Search, Similarity
 import logging
 from functools import singledispatch
 
@@ -20,54 +22,12 @@ if status == DEBUG:
 elif status == RELEASE:
     logger.setLevel(logging.INFO)
 
+render_cache = MathRender.RenderCache()
+RELATED_LIMIT = 50  # 题面相似的题目最多补充的数量
 
 def convert_to_html(md_text):
-    """将Markdown+LaTeX转换为包含MathJax的HTML"""
-    html_content = markdown.markdown(
-        md_text,
-        extensions=['pymdownx.arithmatex'],
-        extension_configs={
-            'pymdownx.arithmatex': {
-                'generic': True  # 使用通用TeX格式（\(...\)和\[...\]）
-            }
-        }
-    )
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/mathjax/3.2.0/es5/tex-mml-chtml.js"></script>
-        <script>
-        MathJax = {{
-            tex: {{
-                inlineMath: [['\\(', '\\)']],
-                displayMath: [['\\[', '\\]']],
-                processEscapes: true
-            }},
-            options: {{
-                ignoreHtmlClass: 'tex2jax_ignore',
-                processHtmlClass: 'tex2jax_process'
-            }}
-        }};
-        </script>
-        <style>
-            body {{ 
-                font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-                line-height: 1.6;
-                padding: 20px;
-                max-width: 800px;
-                margin: 0 auto;
-            }}
-            .MathJax {{ 
-                font-size: 1.1em !important; 
-            }}
-        </style>
-    </head>
-    <body>
-        {html_content}
-    </body>
-    </html>
-    """
+    """将Markdown+LaTeX转换为HTML片段, 优先使用预渲染缓存, 其中没能转换为MathML的公式由题目页面中的MathJax排版"""
+    return render_cache.render(md_text)
 
 
 class HomeWindow(QtWidgets.QMainWindow):
@@ -101,13 +61,27 @@ class HomeWindow(QtWidgets.QMainWindow):
         self.question_show.setObjectName("question_show")
         self.show_layout_h.addWidget(self.question_show, 3,
                                      QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignTop)
-
-        self.question_lib = Questions.QuestionsManager().load_lib(r"题型预测/question.json")
+        # 题目页面只加载一次, 之后切换题目只替换内容
+        self.question_page_ready = False
+        self.pending_content : str | None = None
+        self.question_show.loadFinished.connect(self.question_page_loaded)
+        AppScheme.install(self.question_show.page().profile())
+        self.question_show.setUrl(AppScheme.url("site/question.html"))
+
+        self.question_lib = Questions.shared_lib(r"题型预测/question.json")
+        self.history = History.get_history()
+        self.history.apply_solved(self.question_lib)
+        Recommend.get_table(self.question_lib).start_build()  # 后台预先计算相关题目
+        Similarity.get_index(self.question_lib).start_build()
+        self.history_timer = QtCore.QTimer(self)
+        self.history_timer.timeout.connect(self.history.flush_if_due)
+        self.history_timer.start(int(self.history.flush_interval * 1000))
 
         """右侧栏目相关"""
         self.rightBar = QWebEngineView()
         self.bridge = RightBarWeb.Bridge()
         self.bridge.view = self.rightBar
+        self.rightBar.loadStarted.connect(self.bridge.page_unloaded)
         self.bridge.main_question_connect = self.load_question
         self.bridge.get_tag = self.get_tag
 
@@ -115,7 +89,8 @@ class HomeWindow(QtWidgets.QMainWindow):
         self.channel.registerObject('bridge', self.bridge)  # 注册对象到JavaScript
         self.rightBar.page().setWebChannel(self.channel)
 
-        self.rightBar.setHtml(open(r"question/site/rightBar.html", "r", encoding="utf-8").read())
+        AppScheme.install(self.rightBar.page().profile())
+        self.rightBar.setUrl(AppScheme.url("site/rightBar.html"))
         self.rightBar.setObjectName("rightBar")
         self.show_layout_h.addWidget(self.rightBar, 1)
         """----------------------------------------------------"""
@@ -155,6 +130,8 @@ class HomeWindow(QtWidgets.QMainWindow):
         self.question_answer = None
         self.question_analysis = None
         self.question_tags = []
+        self.question_id : int | None = None
+        self.question_started = time.monotonic()
         self.set_content("欢迎使用")
 
         """菜单"""
@@ -168,6 +145,14 @@ class HomeWindow(QtWidgets.QMainWindow):
         self.open_question.triggered.connect(self.open_question_from_file)
         self.debug_control.addAction(self.open_question)
 
+        self.search_action = QtGui.QAction("搜索题目")
+        self.search_action.triggered.connect(self.search_question)
+        self.debug_control.addAction(self.search_action)
+
+        self.render_stats_action = QtGui.QAction("渲染缓存统计")
+        self.render_stats_action.triggered.connect(self.show_render_stats)
+        self.debug_control.addAction(self.render_stats_action)
+
         self.open_calculator = QtGui.QAction("打开数列计算器")
         self.open_calculator.triggered.connect(self.calculator.show)
 
@@ -178,24 +163,35 @@ class HomeWindow(QtWidgets.QMainWindow):
             self.bridge.handle_tag(file_name)
 
     def set_content(self, md_text):
-        """更新显示内容"""
+        """更新显示内容, 页面还没加载完时先保存, 加载完后再显示"""
         html = convert_to_html(md_text)
-        self.question_show.setHtml(html)
+        if self.question_page_ready:
+            self.show_html(html)
+        else:
+            self.pending_content = html
+
+    def show_html(self, html : str):
+        typeset = "true" if MathRender.needs_typeset(html) else "false"
+        self.question_show.page().runJavaScript(f"setContent({json.dumps(html)}, {typeset});")
+
+    def question_page_loaded(self, ok : bool):
+        if not ok:
+            logger.error("题目页面加载失败")
+            return
+        self.question_page_ready = True
+        if self.pending_content is not None:
+            self.show_html(self.pending_content)
+            self.pending_content = None
 
     def load_question(self, filename : int | str):
         if isinstance(filename, int):
             question_input = self.question_lib[filename]
             print(question_input.surface)
-            self.set_content(question_input.surface + "\n\n" + " ".join(question_input.options))
+            self.set_content(MathRender.question_markdown(question_input))
             _, _, self.question_answer, self.question_analysis, self.question_tags = question_input.unpack()
-            same_tag_list : list[Questions.Question] = []
-            for tag in question_input.tags:
-                same_tag_list += \
-                    [q for _, q in self.question_lib.questions_dir.values()
-                     if tag in q.tags and
-                     q.question_id != question_input.question_id]
-            for i in range(min(5, len(same_tag_list))):
-                self.bridge.question_list[i + 1] = [str(same_tag_list[i].question_id), " ".join(same_tag_list[i].tags)]
+            self.question_id = question_input.question_id
+            self.question_started = time.monotonic()
+            self.bridge.set_results(RightBarWeb.PagedResults(self.related_ids(question_input), self.describe_question))
 
         elif isinstance(filename, str):
             try:
@@ -205,16 +201,28 @@ class HomeWindow(QtWidgets.QMainWindow):
                 logger.error(f"当前目录{os.getcwd()}")
                 raise e
             print(question_input.surface)
-            self.set_content(question_input.surface + "\n\n" + " \n\n ".join(question_input.options))
+            self.set_content(MathRender.question_markdown(question_input))
             _, _, self.question_answer, self.question_analysis, self.question_tags = question_input.unpack()
-            same_tag_list: list[Questions.Question] = []
-            for tag in question_input.tags:
-                same_tag_list += [q for _, q in self.question_lib.questions_dir.values() if tag in q.tags and q.question_id != question_input.question_id]
-            for i in range(min(5, len(same_tag_list))):
-                self.bridge.question_list[i + 1] = [str(same_tag_list[i].question_id), " ".join(same_tag_list[i].tags)]
+            self.question_id = question_input.question_id
+            self.question_started = time.monotonic()
+            self.bridge.set_results(RightBarWeb.PagedResults(self.related_ids(question_input), self.describe_question))
         else:
             logger.error("load_question参数不匹配")
 
+    def related_ids(self, question : Questions.Question) -> list[int]:
+        """按标签推荐的题目在前, 题面相似但标签不同的题目补在后面"""
+        related = list(Recommend.get_table(self.question_lib).related_ids(question))
+        seen = set(related)
+        for question_id, _ in Similarity.get_index(self.question_lib).similar_ids(question, RELATED_LIMIT):
+            if question_id not in seen:
+                seen.add(question_id)
+                related.append(question_id)
+        return related
+
+    def describe_question(self, question_id : int) -> tuple[str, str]:
+        """右侧栏中的一项: (链接, 标题)"""
+        return str(question_id), " ".join(self.question_lib[question_id].tags)
+
     def get_tag(self, filename : int | str) -> list[str]:
         if isinstance(filename, int):
             question_input = self.question_lib[filename]
@@ -233,14 +241,39 @@ class HomeWindow(QtWidgets.QMainWindow):
 
     def check_answer(self):
         if self.question_answer is not None:
-            if str(self.answer_input.text()) == str(self.question_answer):
+            answer = str(self.answer_input.text())
+            correct = answer == str(self.question_answer)
+            if correct:
                 self.statusbar.showMessage("回答正确", 2000)
             else:
                 self.statusbar.showMessage("回答错误", 2000)
+            self.history.record(self.question_id, answer, correct,
+                                time.monotonic() - self.question_started, self.question_tags)
+            if correct and self.question_id in self.question_lib:
+                self.question_lib[self.question_id] = True
         else:
             logger.warning("在未加载问题时提交答案")
             self.statusbar.showMessage("未加载问题", 1000)
 
+    def search_question(self):
+        query, ok = QtWidgets.QInputDialog.getText(self, "搜索题目", "关键词(支持LaTeX命令, 如\\frac, a_{n+1})")
+        if not ok or not query.strip():
+            return
+        results = Search.search(self.question_lib, query)
+        if not results:
+            self.statusbar.showMessage("没有找到相关题目", 2000)
+            return
+        items = [f"{q.question_id}: {q.brief}" for q in results]
+        item, ok = QtWidgets.QInputDialog.getItem(self, "搜索结果", f"共{len(results)}题", items, 0, False)
+        if ok:
+            self.bridge.handle_tag(item.split(":", 1)[0])
+
+    def show_render_stats(self):
+        """渲染缓存的命中率与耗时, 显示在状态栏"""
+        message = f"渲染缓存: {render_cache.stats()}"
+        logger.debug(message)
+        self.statusbar.showMessage(message, 10000)
+
     def change_right_bar_action(self):
         if self.rightBar.isVisible():
             self.rightBar.hide()
@@ -250,7 +283,7 @@ class HomeWindow(QtWidgets.QMainWindow):
     def open_question_from_file(self):
         filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, "选择题目json文件", os.path.abspath('..'), "Json文件 (*.json)")
         if filename:
-            self.load_question(filename)
+            self.bridge.handle_tag(filename)  # 同时更新右侧栏的标签
         else:
             logger.error(f"加载题目失败, 选择了{filename}, {_}")
 
@@ -265,6 +298,7 @@ class HomeWindow(QtWidgets.QMainWindow):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后的程序中, 子进程(沙箱/预渲染)不重新启动界面
     app = QtWidgets.QApplication(sys.argv)
     window = HomeWindow()
     window.show()
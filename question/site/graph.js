@@ -0,0 +1,292 @@
+// 初始化状态标志
+let isChannelReady = false;
+let isD3Ready = false;
+let simulation, svg;
+let webChannelLoaded = false;
+let d3Loaded = false;
+
+// 前端持有的图, 与Python端通过版本号同步
+let graphVersion = -1;
+const graph = { nodes: [], links: [] };
+const nodeById = new Map();
+let linkSel = null, nodeSel = null;
+
+
+// 错误处理
+window.onerror = function(msg, src, line) {
+    console.error("[全局错误]", msg, "at", src, "line", line);
+};
+
+window.addEventListener('windowResize', (e) => {
+    const newWidth = e.detail.width;
+    const newHeight = e.detail.height;
+
+    // 更新画布尺寸
+    svg.attr("width", newWidth)
+       .attr("height", newHeight);
+
+    // 更新力导向参数
+    simulation.force("center", d3.forceCenter(newWidth/2, newHeight/2))
+             .force("x", d3.forceX(newWidth/2).strength(0.05))
+             .force("y", d3.forceY(newHeight/2).strength(0.05))
+             .alpha(0.5).restart();
+});
+
+// D3可用性检查
+document.addEventListener('DOMContentLoaded', () => {
+    if(typeof d3 !== 'undefined') {
+        isD3Ready = true;
+    } else {
+        console.error('D3.js加载失败');
+    }
+});
+
+// Qt WebChannel初始化
+new QWebChannel(qt.webChannelTransport, (channel) => {
+    console.log('WebChannel初始化完成', channel.objects);
+    window.nodeData = channel.objects.nodeData;
+    console.log('nodeData对象可用性', typeof window.nodeData.updateGraph);
+    webChannelLoaded = true;
+    checkInit();
+});
+
+
+
+if (typeof d3 !== 'undefined') {
+    console.log('D3.js已加载');
+    d3Loaded = true;
+    checkInit();
+} else {
+    console.error('D3.js未加载！');
+}
+function checkInit() {
+    console.log('检查初始化状态，webChannelLoaded:', webChannelLoaded, 'd3Loaded:', d3Loaded);
+    if (webChannelLoaded && d3Loaded) {
+        console.log('全部依赖加载完成，开始初始化');
+        realInitialize();
+    }
+}
+
+// 统一初始化入口
+function realInitialize() {
+
+    console.log('开始初始化D3图表');
+
+    if(window.existingSimulation) {
+        window.existingSimulation.stop();
+        window.existingSimulation = null;
+    }
+
+    // 绑定数据更新信号: 完整的图
+    window.nodeData.updateGraph.connect(function(data) {
+        try {
+            setGraph(JSON.parse(data));
+        } catch (e) {
+            console.error('解析数据失败:', e);
+        }
+    });
+
+    // 增量更新
+    window.nodeData.graphPatch.connect(function(data) {
+        try {
+            applyPatch(JSON.parse(data));
+        } catch (e) {
+            console.error('解析增量失败:', e);
+        }
+    });
+
+
+    // 创建SVG画布
+    const width = 1200, height = 800;
+    svg = d3.select("#graph")
+        .append("svg")
+        .attr("width", width)
+        .attr("height", height);
+
+    // 初始化力导向模拟
+        simulation = d3.forceSimulation()
+            .force("link", d3.forceLink().id(d => d.id).distance(150))
+            .force("charge", d3.forceManyBody().strength(-120))
+            .force("collide", d3.forceCollide().radius(30))
+            .force("center", d3.forceCenter(width/2, height/2))
+            .force("x", d3.forceX(width/2).strength(0.05))
+            .force("y", d3.forceY(height/2).strength(0.05))
+            .alphaDecay(0.05)  // 降低冷却速度
+            .velocityDecay(0.4)
+            .alpha(0)  // 创建后不自动运行, 带布局的数据到达时不能被打乱, 需要时由render加热
+            .stop();
+
+    window.existingSimulation = simulation;
+
+}
+
+// 拖动中的位置按帧合并后发送给Python
+const pendingPositions = new Map();
+let positionFrame = null;
+
+function queuePosition(d) {
+    pendingPositions.set(d.id, [d.id, d.fx, d.fy]);
+    if (positionFrame === null) {
+        positionFrame = requestAnimationFrame(flushPositions);
+    }
+}
+
+function flushPositions() {
+    if (positionFrame !== null) {
+        cancelAnimationFrame(positionFrame);
+        positionFrame = null;
+    }
+    if (pendingPositions.size === 0) return;
+    window.nodeData.handlePositionsChanged(JSON.stringify(Array.from(pendingPositions.values())));
+    pendingPositions.clear();
+}
+
+// 拖拽处理函数
+function dragHandler() {
+    function dragstart(event, d) {
+        if (!event.active) simulation.alphaTarget(0.3).restart();
+        d.fx = d.x;
+        d.fy = d.y;
+    }
+
+    function dragging(event, d) {
+        d.fx = event.x;
+        d.fy = event.y;
+        queuePosition(d);
+    }
+
+    function dragend(event, d) {
+        queuePosition(d);
+        flushPositions();
+        if (!event.active) simulation.alphaTarget(0);
+        d.fx = null;
+        d.fy = null;
+    }
+
+    return d3.drag()
+        .on("start", dragstart)
+        .on("drag", dragging)
+        .on("end", dragend);
+}
+
+// 完整替换图
+function setGraph(data) {
+    graph.nodes = data.nodes;
+    graph.links = data.links;
+    nodeById.clear();
+    graph.nodes.forEach(n => nodeById.set(n.id, n));
+    graphVersion = data.version;
+    // 位置已由Python端算好时不重新布局
+    render(data.layout ? 0 : 1);
+}
+
+// 按版本应用增量: 删除 -> 新增 -> 修改属性
+function applyPatch(patch) {
+    if (patch.base !== graphVersion) {
+        console.warn('版本不连续, 请求完整的图', graphVersion, patch.base);
+        window.nodeData.requestFullGraph(graphVersion);
+        return;
+    }
+    if (patch.remove.nodes.length) {
+        const removed = new Set(patch.remove.nodes);
+        graph.nodes = graph.nodes.filter(n => !removed.has(n.id));
+        removed.forEach(id => nodeById.delete(id));
+    }
+    if (patch.remove.links.length || patch.remove.nodes.length) {
+        const removed = new Set(patch.remove.links);
+        graph.links = graph.links.filter(l => !removed.has(l.id)
+            && nodeById.has(endpointId(l.source)) && nodeById.has(endpointId(l.target)));
+    }
+    patch.add.nodes.forEach(n => {
+        graph.nodes.push(n);
+        nodeById.set(n.id, n);
+    });
+    patch.add.links.forEach(l => graph.links.push(l));
+    patch.patch.forEach(p => {
+        const node = nodeById.get(p.id);
+        if (node) Object.assign(node, p);
+    });
+    graphVersion = patch.version;
+    // 只有结构变化时才重新加热布局, 且不从1开始
+    const structural = patch.remove.nodes.length || patch.remove.links.length
+        || patch.add.nodes.length || patch.add.links.length;
+    render(structural && !patch.layout ? 0.3 : 0);
+}
+
+function endpointId(end) {
+    return typeof end === 'object' ? end.id : end;
+}
+
+// 数据绑定, 只创建/删除变化的元素
+function render(alpha) {
+    linkSel = svg.selectAll(".link")
+        .data(graph.links, d => d.id)
+        .join("line")
+        .attr("class", "link");
+
+    nodeSel = svg.selectAll(".node-group")
+        .data(graph.nodes, d => d.id)
+        .join(enter => {
+            const g = enter.append("g")
+                .attr("class", "node-group")
+                .call(dragHandler())
+                .on("click", function(event, d) {
+                    console.log("[前端] 节点被点击，Tag:", d.tag);
+                    window.nodeData.handleNodeClick(d.tag);
+                    event.stopPropagation();
+                });
+            g.append("circle")
+                .attr("class", "node-circle")
+                .attr("r", 30)
+                .on("mouseover", function() {
+                    d3.select(this).transition().attr("r", 25);
+                })
+                .on("mouseout", function() {
+                    d3.select(this).transition().attr("r", 20);
+                });
+            g.append("text")
+                .attr("class", "node-text")
+                .attr("dy", "0.3em");
+            return g;
+        });
+
+    // 名称与标签可能被patch修改, 每次都更新文字
+    nodeSel.select(".node-circle")
+        .attr("r", d => d.kind === "question" || d.kind === "more" ? 20 : 30)
+        .style("fill", d => d.kind === "question" ? "#4CAF50" : d.kind === "more" ? "#9E9E9E" : null);
+    nodeSel.select(".node-text")
+        .text(d => d.count ? `${d.name} (${d.count})` : d.name)
+        .style("font-size", d => {
+            const length = String(d.tag).length;
+            if (length > 15) return "8px";
+            if (length > 10) return "10px";
+            return "12px";
+        });
+
+    simulation.nodes(graph.nodes);
+    simulation.force("link").links(graph.links);
+    simulation.force("collide").strength(0.7);
+
+    simulation.on("tick", () => {
+        linkSel.attr("x1", d => d.source.x)
+            .attr("y1", d => d.source.y)
+            .attr("x2", d => d.target.x)
+            .attr("y2", d => d.target.y);
+        const width = 1200, height = 800;
+        nodeSel.attr("transform", d => `translate(${d.x},${d.y})`)
+            .each(function(d) {
+            const node = d3.select(this);
+            const isNearEdge = d.x < 30 || d.x > width-30 ||
+                            d.y < 30 || d.y > height-30;
+            node.attr("fill", isNearEdge ? "red" : "#2196F3");
+        });
+    });
+
+    if (alpha > 0) {
+        simulation.alpha(Math.max(simulation.alpha(), alpha)).restart();
+    } else {
+        // 属性修改不需要重新布局, 只刷新一帧
+        simulation.tick(0);
+        simulation.on("tick")();
+    }
+}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 程序从仓库根目录运行, 以 question.base 导入各个模块
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+import io
+import json
+
+import pytest
+
+from question.base import QuestionStream
+
+RECORDS = [
+    {"id": 1, "text": "普通的题目", "tags": ["数列", "递推"]},
+    {"id": 2, "text": "带 \"引号\" 与 \\ 反斜杠 \\\" 的题目"},
+    {"id": 3, "text": "字符串中的括号 { [ ] } 与 \"{\"", "nested": {"a": [1, {"b": "}"}]}},
+    {"id": 4, "text": "结尾是反斜杠\\", "empty": {}},
+]
+
+
+def raw_records(data : bytes, chunk_size : int) -> list[tuple[int, bytes]]:
+    return list(QuestionStream.iter_raw_records(io.BytesIO(data), chunk_size))
+
+
+def check(data : bytes, chunk_size : int):
+    result = raw_records(data, chunk_size)
+    assert [json.loads(raw) for _, raw in result] == RECORDS
+    for offset, raw in result:  # 偏移指向记录在文件中的起点
+        assert data[offset:offset + len(raw)] == raw
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_array_every_chunk_size(indent):
+    data = json.dumps(RECORDS, ensure_ascii=False, indent=indent).encode("utf-8")
+    for chunk_size in range(1, len(data) + 2):
+        check(data, chunk_size)
+
+
+def test_json_lines_every_chunk_size():
+    data = "\n".join(json.dumps(r, ensure_ascii=False) for r in RECORDS).encode("utf-8")
+    for chunk_size in range(1, len(data) + 2):
+        check(data, chunk_size)
+
+
+def test_bom_and_leading_blank():
+    data = b"\xef\xbb\xbf \n" + json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")
+    for chunk_size in (1, 2, 3, 5, 1 << 16):
+        check(data, chunk_size)
+
+
+def test_unfinished_record_is_dropped():
+    data = json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")[:-10]
+    for chunk_size in (1, 7, 1 << 16):
+        assert [json.loads(raw) for _, raw in raw_records(data, chunk_size)] == RECORDS[:-1]
+
+
+def test_iter_records_skips_broken(tmp_path):
+    path = tmp_path / "questions.json"
+    path.write_bytes(b'[{"id": 1}, {"id": 2,}, {"id": 3}]')
+    progress = []
+    records = list(QuestionStream.iter_records(str(path), lambda *args: progress.append(args), chunk_size=4))
+    assert records == [{"id": 1}, {"id": 3}]
+    assert progress[-1] == (path.stat().st_size, path.stat().st_size, 2)
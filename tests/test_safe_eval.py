@@ -0,0 +1,103 @@
+import time
+
+import numpy
+import pytest
+
+from question.base import SafeEval, SequenceEngine
+
+
+@pytest.mark.parametrize("expr, kind", [
+    ("__import__('os')", "name"),
+    ("__import__", "name"),
+    ("n.__class__", "forbidden"),
+    ("math.__dict__", "forbidden"),
+    ("math.sqrt.__globals__", "forbidden"),
+    ("().__class__.__bases__", "forbidden"),
+    ("(lambda: 1)()", "forbidden"),
+    ("[x for x in range(9)]", "forbidden"),
+    ("open", "name"),
+    ("'a' * 9", "forbidden"),
+    ("True + n", "forbidden"),
+    ("pow(n, base=2)", "forbidden"),
+    ("a[n-1]", "forbidden"),
+    ("n +", "syntax"),
+])
+def test_parse_rejects(expr, kind):
+    with pytest.raises(SafeEval.EvalError) as error:
+        SafeEval.parse(expr)
+    assert error.value.kind == kind
+
+
+def test_recurrence_subscript():
+    SafeEval.parse("a[n-1] + a[n-2]", variables=("a", "n"))
+    with pytest.raises(SafeEval.EvalError) as error:
+        SafeEval.parse("n[0]", variables=("a", "n"))
+    assert error.value.kind == "forbidden"
+
+
+def evaluate(expr : str, n : int = 0):
+    return eval(SafeEval.compile_safe(SafeEval.parse(expr)), {"__builtins__": {}}, SafeEval.namespace(n=n))
+
+
+@pytest.mark.parametrize("expr", ["9**9**9", "(n + 3) ** 10**6", "(n + 2) ** (9 ** 7) if n > 0 else 0",
+                                  "factorial(10**6)", "comb(10**6, 3)", "(n + 1/3) ** 10**6 if n < 0 else 7 ** 10**6"])
+def test_budget(expr):
+    with pytest.raises(SafeEval.EvalError) as error:
+        evaluate(expr, 1)
+    assert error.value.kind == "budget"
+
+
+def test_allowed():
+    assert evaluate("2**100 + math.floor(pi) + int(sqrt(n))", 4) == 2 ** 100 + 5
+    assert evaluate("(n + 1) ** 300 % 7", 2) == 3 ** 300 % 7
+    assert evaluate("factorial(20)") == 2432902008176640000
+
+
+def test_operation_budget():
+    budget = SafeEval.Budget(10)
+    budget.charge(10)
+    with pytest.raises(SafeEval.EvalError) as error:
+        budget.charge(1)
+    assert error.value.kind == "budget"
+
+
+def test_error_message():
+    error = SafeEval.EvalError("name", "foo", 3)
+    assert str(error) == "未知的名字: foo (第4个字符)"
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = SafeEval.Sandbox(timeout=2.0)
+    yield sandbox
+    sandbox.close()
+
+
+def test_sandbox_result(sandbox):
+    values = sandbox.call(SequenceEngine.compute_values, SequenceEngine.CLOSED_FORM, "n**2", (), 5)
+    numpy.testing.assert_array_equal(values, [0, 1, 4, 9, 16])
+    chunks = []
+    assert sandbox.call(SequenceEngine.iter_values, SequenceEngine.RECURRENCE, "a[n-1] + 1", ("0",), 5,
+                        on_chunk=chunks.append) is None
+    numpy.testing.assert_array_equal(numpy.concatenate(chunks), [0, 1, 2, 3, 4])
+
+
+def test_sandbox_errors(sandbox):
+    with pytest.raises(SafeEval.EvalError) as error:
+        sandbox.call(SequenceEngine.compute_term, SequenceEngine.CLOSED_FORM, "9**9**9", (), 0)
+    assert error.value.kind == "budget"
+    with pytest.raises(SafeEval.EvalError) as error:
+        sandbox.call(SequenceEngine.compute_values, SequenceEngine.CLOSED_FORM, "__import__('os')", (), 5)
+    assert error.value.kind == "name"
+
+
+def test_sandbox_timeout_and_cancel(sandbox):
+    sandbox.start()
+    with pytest.raises(SafeEval.EvalError) as error:
+        sandbox.call(time.sleep, 10, timeout=0.5)
+    assert error.value.kind == "timeout"
+    start = time.monotonic()
+    with pytest.raises(SafeEval.EvalError) as error:
+        sandbox.call(time.sleep, 10, cancelled=lambda: time.monotonic() - start > 0.5)
+    assert error.value.kind == "cancelled"
+    assert sandbox.call(abs, -3) == 3  # 结束后重新启动的进程可以继续使用
@@ -0,0 +1,210 @@
+import decimal
+from fractions import Fraction
+
+import numpy
+import pytest
+
+from question.base import SafeEval, SequenceEngine
+from question.base.SequenceEngine import ClosedForm, Recurrence
+
+# (递推式, 初始项, 同一个数列但不能按线性递推识别的写法)
+RECURRENCES = [
+    ("a[n-1] + a[n-2]", ("0", "1"), "a[n-1] + a[n-2] + 0*n"),
+    ("2*a[n-1] - a[n-3]/4 + 1", ("1", "0.5", "-2"), "2*a[n-1] - a[n-3]/4 + 1 + 0*n"),
+    ("-(a[n-2] - 3) * 0.5", ("2", "7"), "-(a[n-2] - 3) * 0.5 + 0*n"),
+]
+
+
+# (通项公式, 起点, 终点)
+VECTOR_FORMULAS = [
+    ("n**2 / 3 + 1", 0, 500),
+    ("sin(n) * exp(-n / 50) + math.cos(pi * n)", 0, 500),
+    ("1 / (n - 5) + 1 / (n - 5.0)", 0, 50),
+    ("log(n) + log(n, 2) + log10(n)", 0, 50),
+    ("sqrt(n - 10)", 0, 50),
+    ("2.0 ** n + exp(n)", 0, 1200),
+    ("(-1) ** n * n", 0, 50),
+    ("n % 7 - n // 3 if n > 3 else -n", 0, 50),
+    ("floor(n / 3) + ceil(n / 4) + round(n / 2) + trunc(-n / 3)", 0, 50),
+    ("max(n, 10) - min(n, 3) + abs(5 - n) + fabs(-n)", 0, 50),
+    ("atan2(n, 3) + hypot(n, 4) + tanh(n / 10)", 0, 50),
+    ("n ** n", 9800, 9900),  # 逐项计算时超出整数的位数限制, 整体计算时溢出
+    ("n ** 3 - 2 ** n", 1000, 1100),
+]
+
+
+@pytest.mark.parametrize("expr, start, stop", VECTOR_FORMULAS)
+def test_vectorized_matches_per_element(expr, start, stop):
+    form = ClosedForm(expr)
+    assert form.vectorized
+    vector = form._vector_range(start, stop)
+    element = numpy.concatenate([SequenceEngine.to_floats(chunk) for chunk in form._iter_by_element(start, stop)])
+    numpy.testing.assert_allclose(vector, element, rtol=1e-12, equal_nan=True)
+
+
+def test_per_element_budget_is_nan():
+    """不能整体计算的公式, float64时单独一项过大记为nan, 与整体计算一致"""
+    vector = ClosedForm("n ** n")._vector_range(9800, 9900)
+    element = ClosedForm("n ** n + (0 if n and n or 1 else 0)")
+    assert not element.vectorized
+    chunks = [SequenceEngine.to_floats(chunk) for chunk in element._iter_by_element(9800, 9900)]
+    numpy.testing.assert_allclose(numpy.concatenate(chunks), vector, rtol=1e-12, equal_nan=True)
+    assert numpy.isnan(list(ClosedForm("factorial(n)")._iter_by_element(10000, 10010))[0][1:]).all()
+    with pytest.raises(SafeEval.EvalError):  # 精确计算时仍然报告
+        list(ClosedForm("n ** (100 * n)", SequenceEngine.numbers("exact"))._iter_by_element(2000, 2010))
+
+
+def reference(expr : str, initial : tuple, count : int) -> list[float]:
+    a = [float(v) for v in initial]
+    namespace = SafeEval.namespace(a=a)
+    code = SafeEval.compile_safe(SafeEval.parse(expr, variables=("a", "n")))
+    for k in range(len(a), count):
+        namespace["n"] = k
+        a.append(float(eval(code, {"__builtins__": {}}, namespace)))
+    return a[:count]
+
+
+@pytest.mark.parametrize("expr, initial, generic", RECURRENCES)
+def test_linear_matches_generic(expr, initial, generic):
+    linear = Recurrence(expr, initial)
+    element = Recurrence(generic, initial)
+    assert linear.filtered and not element.linear
+    expected = reference(expr, initial, 60)
+    numpy.testing.assert_allclose(linear.values(60), expected, rtol=1e-12)
+    numpy.testing.assert_allclose(element.values(60), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("expr, initial, generic", RECURRENCES)
+def test_linear_loop_without_scipy(monkeypatch, expr, initial, generic):
+    monkeypatch.setattr(SequenceEngine, "lfilter", None)
+    numpy.testing.assert_allclose(Recurrence(expr, initial).values(60), reference(expr, initial, 60), rtol=1e-12)
+
+
+@pytest.mark.parametrize("expr, initial, generic", RECURRENCES)
+def test_tail_extension(expr, initial, generic):
+    for source in (expr, generic):
+        sequence = Recurrence(source, initial)
+        first = sequence.values(7)
+        longer = sequence.values(40)
+        numpy.testing.assert_array_equal(longer[:7], first)
+        numpy.testing.assert_allclose(longer, Recurrence(source, initial).values(40), rtol=1e-12)
+        assert len(sequence.values(3)) == 3
+
+
+@pytest.mark.parametrize("expr, initial, generic", RECURRENCES)
+def test_matrix_power_term(expr, initial, generic):
+    sequence = Recurrence(expr, initial)
+    values = reference(expr, initial, 60)
+    for index in (0, len(initial) - 1, len(initial), 17, 59):
+        assert sequence.term(index) == pytest.approx(values[index], rel=1e-9)
+        assert Recurrence(generic, initial).term(index) == pytest.approx(values[index], rel=1e-9)
+
+
+def test_matrix_power_modulus():
+    fibonacci = Recurrence("a[n-1] + a[n-2]", ("0", "1"))
+    a, b = 0, 1
+    for _ in range(1000):
+        a, b = b, a + b
+    assert fibonacci.term(1000, 10 ** 9 + 7) == a % (10 ** 9 + 7)
+    assert fibonacci.term(10 ** 18, 10) == fibonacci.term(10 ** 18 % 60, 10)  # 斐波那契数列模10的周期为60
+    with pytest.raises(SafeEval.EvalError):
+        Recurrence("a[n-1] / 2", ("1",)).term(10, 7)
+    with pytest.raises(SafeEval.EvalError):
+        fibonacci.term(10 ** 6)  # 超出浮点数的范围
+    for mode, expr, initial in ((SequenceEngine.RECURRENCE, "a[n-1] + a[n-2]", ("0", "1")),
+                                (SequenceEngine.CLOSED_FORM, "n ** 2", ())):
+        with pytest.raises(SafeEval.EvalError):
+            SequenceEngine.compute_term(mode, expr, initial, 100, modulus=0)
+    with pytest.raises(SafeEval.EvalError):
+        fibonacci.term(1, 0)  # 初始项也不能按模0返回
+
+
+@pytest.mark.parametrize("backend", ["float", "exact", "decimal"])
+def test_closed_form_tail_extension(backend):
+    expr = "1/0 if n >= 10 and n else n"
+    form = ClosedForm(expr, SequenceEngine.numbers(backend))
+    form.values(10)
+    extended = form.values(20)
+    numpy.testing.assert_array_equal(extended, ClosedForm(expr, SequenceEngine.numbers(backend)).values(20))
+    assert numpy.isnan(extended[10:]).all()
+    with pytest.raises(SafeEval.EvalError):  # 从头算起没有一项能算出来时报告
+        ClosedForm("1/0 + n", SequenceEngine.numbers(backend)).values(5)
+
+
+def test_exact_round_trip():
+    numbers = SequenceEngine.numbers("exact")
+    assert numbers.number("1/3") == Fraction(1, 3)
+    assert numbers.number(0.1) == Fraction(1, 10)
+    assert numbers.number("4/2") == 2 and type(numbers.number("4/2")) is int
+    sequence = Recurrence("a[n-1]/2 + a[n-2]", ("1/3", "2"), numbers)
+    values = [Fraction(1, 3), 2]
+    for _ in range(40):
+        values.append(Fraction(values[-1]) / 2 + values[-2])
+    chunks = list(sequence.iter_values(42))
+    assert [v for chunk in chunks for v in chunk] == values
+    assert sequence.term(41) == values[41]
+    assert Recurrence("a[n-1]/2 + a[n-2] + 0*n", ("1/3", "2"), numbers).term(41) == values[41]
+    numpy.testing.assert_allclose(sequence.values(42), [float(v) for v in values])
+
+
+def test_exact_large_terms():
+    fibonacci = SequenceEngine.compile_recurrence("a[n-1] + a[n-2]", ("0", "1"), "exact")
+    a, b = 0, 1
+    for _ in range(5000):
+        a, b = b, a + b
+    assert fibonacci.term(5000) == a
+    with pytest.raises(SafeEval.EvalError) as error:
+        fibonacci.term(10 ** 9)
+    assert error.value.kind == "budget"
+
+
+@pytest.mark.parametrize("precision", [10, 30, 80])
+def test_decimal_round_trip(precision):
+    numbers = SequenceEngine.numbers("decimal", precision)
+    third = numbers.number("1/3")
+    assert isinstance(third, decimal.Decimal) and str(third) == "0." + "3" * precision
+    assert numbers.number(0.1) == decimal.Decimal("0.1")
+    value = SequenceEngine.compute_term(SequenceEngine.CLOSED_FORM, "sqrt(2)", (), 0,
+                                        backend="decimal", precision=precision)
+    with decimal.localcontext(decimal.Context(prec=precision)):
+        assert value == decimal.Decimal(2).sqrt()
+
+
+PI_60 = decimal.Decimal("3.14159265358979323846264338327950288419716939937510582097494459")
+E_60 = decimal.Decimal("2.71828182845904523536028747135266249775724709369995957496696763")
+
+
+@pytest.mark.parametrize("precision", [10, 50, 60])
+def test_decimal_constants(precision):
+    context = decimal.Context(prec=precision)
+    pi, e = context.plus(PI_60), context.plus(E_60)
+    for expr, expected in (("pi * n", context.multiply(3, pi)), ("math.e + 0 * n", e),
+                           ("tau / 2 * n", context.multiply(3, pi))):
+        value = SequenceEngine.compute_term(SequenceEngine.CLOSED_FORM, expr, (), 3, backend="decimal",
+                                            precision=precision)
+        assert abs(value - context.plus(expected)) <= decimal.Decimal(10) ** (1 - precision), expr
+    sequence = Recurrence("a[n-1] * pi", ("1",), SequenceEngine.numbers("decimal", precision))
+    assert sequence.linear
+    values = [v for chunk in sequence.iter_values(3) for v in chunk]
+    term = Recurrence("a[n-1] * pi", ("1",), SequenceEngine.numbers("decimal", precision)).term(2)
+    square = context.multiply(pi, pi)
+    for value in (values[2], term):
+        assert abs(value - square) <= decimal.Decimal(10) ** (2 - precision)
+
+
+def test_decimal_math_functions():
+    numbers = SequenceEngine.numbers("decimal", 30)
+    for expr in ("a[n-1] + sin(n)", "a[n-1] + math.cos(n) * pi", "a[n-1] + exp(1) - log(n)"):
+        values = list(Recurrence(expr, ("1",), numbers).iter_values(10))
+        assert all(isinstance(v, decimal.Decimal) for chunk in values for v in chunk)
+    with pytest.raises(SafeEval.EvalError):
+        list(Recurrence("a[n-1] + a", ("1",), numbers).iter_values(5))
+
+
+@pytest.mark.parametrize("backend", ["float", "exact", "decimal"])
+def test_backends_agree(backend):
+    for mode, expr, initial in ((SequenceEngine.RECURRENCE, "3*a[n-1]/4 - a[n-2] + 0.5", ("1", "1/2")),
+                                (SequenceEngine.CLOSED_FORM, "(n**2 + 1) / (n + 3) + 0.25", ())):
+        expected = SequenceEngine.compute_values(mode, expr, initial, 30)
+        numpy.testing.assert_allclose(SequenceEngine.compute_values(mode, expr, initial, 30, backend),
+                                      expected, rtol=1e-9)